@@ -1,7 +1,10 @@
 from fastapi import FastAPI
 from src.api.routes import router
+from src.api.middleware import RequestMetricsMiddleware
 
 app = FastAPI(title="SHL GenAI Assessment Recommender")
 
 app.include_router(router)
+# Per-route latency for /metrics and the optional Server-Timing header
+app.add_middleware(RequestMetricsMiddleware)
 
@@ -22,26 +22,11 @@ if st.button("Recommend"):
     try:
         engine = get_engine()
         
-        # Get recommendations directly from the engine
-        explanation = engine.recommend(query)
-        docs = engine.search(query, k=10)
+        # Get recommendations directly from the engine (single retrieval)
+        explanation, retrieval = engine.recommend(query)
         
-        results = []
-        for doc in docs:
-            meta = doc.metadata
-            test_type = meta.get("test_type", "")
-            if isinstance(test_type, str):
-                test_type = test_type.split(",")
-                
-            results.append({
-                "url": meta.get("url", ""),
-                "name": meta.get("name", ""),
-                "description": meta.get("description", ""),
-                "test_type": test_type,
-                "duration": meta.get("duration", 0),
-                "remote_support": meta.get("remote_support", "Yes"),
-                "adaptive_support": meta.get("adaptive_support", "No")
-            })
+        # Payloads are precomputed per assessment when the index loads
+        results = [engine.payloads.payload(row) for row in retrieval.rows]
             
         res = {
             "recommended_assessments": results,
@@ -79,9 +64,8 @@ if st.button("Recommend"):
                 st.markdown(f"**Remote Testing:** {r.get('remote_support', 'N/A')}")
                 st.markdown(f"**Adaptive/IRT:** {r.get('adaptive_support', 'N/A')}")
                 
-                duration = r.get('duration', 0)
-                duration_str = f"{duration} minutes" if duration else "N/A"
-                st.markdown(f"**Duration:** {duration_str}")
+                # Formatted once per assessment in the precomputed payload
+                st.markdown(f"**Duration:** {r['duration_display']}")
 
             st.markdown("---")
 
@@ -0,0 +1,49 @@
+import time
+
+from src.utils.metrics import REQUEST_SECONDS, start_request_timings, server_timing
+from src.config import SERVER_TIMING
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and, optionally, a ``Server-Timing`` header.
+
+    Stage durations recorded while the request runs (embedding, search,
+    LLM, ...) are collected per request; the header carries those measured
+    before the response starts. ``SERVER_TIMING`` controls when it is sent:
+    ``"always"``, ``"request"`` (when the client sends ``X-Server-Timing: 1``)
+    or ``"off"``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = start_request_timings()
+        status = {"code": 500}
+        wants_timing = SERVER_TIMING == "always" or (
+            SERVER_TIMING == "request" and (b"x-server-timing", b"1") in scope.get("headers", [])
+        )
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if wants_timing:
+                    timings["total"] = time.perf_counter() - started
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(timings).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Route templates (e.g. /recommend) keep the label set bounded
+            route = scope.get("route")
+            REQUEST_SECONDS.labels(
+                scope["method"], route.path if route is not None else "unmatched", str(status["code"])
+            ).observe(time.perf_counter() - started)
@@ -1,52 +1,341 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+import asyncio
+import os
+import threading
+import time
+from typing import Literal
 
-from src.rag.rag_engine import AssessmentRecommendationEngine
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+from pydantic import BaseModel, Field
+
+from src.rag.engine_registry import CatalogNotReadyError, EngineRegistry, UnknownCatalogError
+from src.rag.diversify import DiversityOptions
+from src.rag.payloads import parse_fields
+from src.rag.rag_engine import StreamInterruptedError
+from src.utils.fast_json import dumps, join_array, join_object
+from src.utils.metrics import EngineCollector, timed
+from src.utils.result_sink import ResultSink
+from src.vector_store.filters import SearchFilters
+from src.vector_store.versions import current_version
+from src.config import (
+    TOP_K, BATCH_MAX_QUERIES, BATCH_LLM_CONCURRENCY, RESULT_SINK_ENABLED, RESULT_SINK_PATH, RESULT_SINK_QUEUE_SIZE, RESULT_SINK_BATCH_SIZE,
+    INDEX_WATCH_INTERVAL_S, DIVERSITY_LAMBDA, CATALOG_BUILD_RETRY_AFTER_S
+)
 
 router = APIRouter()
 
-engine = None
+# Engines per catalog; the default catalog's engine is loaded at startup
+registry = None
+# Chat model to use instead of Gemini (e.g. the benchmark's offline fake); set before startup
+engine_llm = None
+result_sink = None
+startup_error = None
+startup_thread = None
+
+# Hot reload: one reload at a time; the watcher stops on shutdown
+reload_lock = threading.Lock()
+reload_status = {"last_reload_at": None, "last_error": None}
+watcher_stop = threading.Event()
+
+# Index size / version and cache counters are read from the registry on each scrape
+REGISTRY.register(EngineCollector(lambda: registry))
+
+class FiltersModel(BaseModel):
+    remote_support: bool | None = None
+    adaptive_support: bool | None = None
+    test_types: list[str] | None = None
+    min_duration: float | None = Field(None, ge=0)
+    max_duration: float | None = Field(None, ge=0)
+
+    def to_filters(self):
+        return SearchFilters(**self.model_dump())
+
+class DiversityModel(BaseModel):
+    # Set enabled=False to turn off server-side diversification for a request
+    enabled: bool = True
+    relevance_weight: float = Field(DIVERSITY_LAMBDA, ge=0, le=1)
+    max_per_type: int | None = Field(None, ge=1)
+    type_quotas: dict[str, int] | None = None
+
+    def to_options(self):
+        if not self.enabled:
+            return False
+        return DiversityOptions(self.relevance_weight, self.max_per_type, self.type_quotas)
 
 class RecommendRequest(BaseModel):
     query: str
+    # Catalog id (see CATALOGS in src/config.py); None uses DEFAULT_CATALOG
+    catalog: str | None = None
+    filters: FiltersModel | None = None
+    # Defaults to SEARCH_MODE from src/config.py
+    search_mode: Literal["dense", "hybrid"] | None = None
+    # None uses the server default (on when a reranker is configured)
+    rerank: bool | None = None
+    # MMR / test type quotas over the results; None uses DIVERSITY_ENABLED
+    diversity: DiversityModel | None = None
+
+class BatchRecommendRequest(BaseModel):
+    queries: list[str] = Field(..., max_length=BATCH_MAX_QUERIES)
+    catalog: str | None = None
+    # Applied to every query in the batch
+    filters: FiltersModel | None = None
+    search_mode: Literal["dense", "hybrid"] | None = None
+    # None uses the server default (on when a reranker is configured)
+    rerank: bool | None = None
+    diversity: DiversityModel | None = None
+    # LLM explanations are optional for bulk screening
+    explain: bool = False
+    max_concurrency: int = Field(BATCH_LLM_CONCURRENCY, ge=1, le=BATCH_LLM_CONCURRENCY)
 
 @router.on_event("startup")
 def startup():
-    global engine
-    # Initialize the RAG engine (loads FAISS index and LLM)
-    engine = AssessmentRecommendationEngine()
+    global result_sink, startup_thread
+    # Recent FastAPI versions run an included router's startup handlers twice
+    # (app handlers + merged router lifespan); load the engine only once
+    if startup_thread is not None:
+        return
+    # Persisting results is opt-in for the service; the sink writes in the background
+    if RESULT_SINK_ENABLED:
+        result_sink = ResultSink(
+            RESULT_SINK_PATH,
+            max_queue=RESULT_SINK_QUEUE_SIZE,
+            batch_size=RESULT_SINK_BATCH_SIZE
+        )
+    # Load and warm up the engine in the background so the process is live
+    # (GET /health) immediately and ready (GET /ready) once warm-up is done
+    startup_thread = threading.Thread(target=_load_engine, name="engine-startup", daemon=True)
+    startup_thread.start()
+
+def _load_engine():
+    global registry, startup_error
+    try:
+        # Initialize the default catalog's engine (loads the index, embedder and LLM);
+        # other catalogs load on first use and share its models
+        loaded = EngineRegistry(result_sink=result_sink, llm=engine_llm)
+        loaded.default.warmup()
+        registry = loaded
+    except Exception as e:
+        startup_error = str(e)
+        print(f"Engine startup failed: {e}")
+        return
+    if INDEX_WATCH_INTERVAL_S > 0:
+        threading.Thread(target=_watch_index, name="index-watcher", daemon=True).start()
+
+def _watch_index():
+    while not watcher_stop.wait(INDEX_WATCH_INTERVAL_S):
+        # Only loaded catalogs are watched; others load their current version on first use
+        for catalog_id, current_engine in registry.loaded():
+            try:
+                if current_version(current_engine.index_path) != current_engine.index_version:
+                    _reload_engine(catalog_id)
+            except Exception as e:
+                print(f"Index watcher error ({catalog_id}): {e}")
+
+def _reload_engine(catalog_id=None):
+    """Load the current index version next to the live engine, then swap the reference.
+
+    Requests that already hold the old engine finish on it; new requests
+    see the new one. Returns False if another reload is in progress.
+    """
+    if not reload_lock.acquire(blocking=False):
+        return False
+    try:
+        previous = registry.get(catalog_id)
+        loaded = previous.reload()
+        loaded.warmup()
+        # A single reference assignment: atomic for concurrent readers
+        registry.replace(catalog_id or registry.default_catalog, loaded)
+        reload_status.update(last_reload_at=time.time(), last_error=None)
+        print(f"Swapped index {previous.index_version} -> {loaded.index_version}")
+        return True
+    except Exception as e:
+        reload_status["last_error"] = str(e)
+        print(f"Index reload failed, still serving the previous version: {e}")
+        raise
+    finally:
+        reload_lock.release()
+
+def _get_registry():
+    if registry is None:
+        detail = f"Engine failed to start: {startup_error}" if startup_error else "Engine is starting up."
+        raise HTTPException(status_code=503, detail=detail)
+    return registry
+
+async def _get_engine(catalog_id=None):
+    current_registry = _get_registry()
+    current_engine = current_registry.cached(catalog_id)
+    if current_engine is not None:
+        return current_engine
+    try:
+        # First use of a catalog loads its index off the event loop
+        return await asyncio.to_thread(current_registry.get, catalog_id)
+    except UnknownCatalogError:
+        raise HTTPException(status_code=404, detail=f"Unknown catalog '{catalog_id}'")
+    except CatalogNotReadyError as e:
+        # The index is built in the background; the client retries once it is published
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(CATALOG_BUILD_RETRY_AFTER_S)})
+
+@router.on_event("shutdown")
+def shutdown():
+    watcher_stop.set()
+    if registry is not None:
+        # Catalog engines share the default engine's executor and caches
+        registry.default.close()
+    # Flush any queued results before the process exits
+    if result_sink is not None:
+        result_sink.close()
 
 @router.get("/health")
 def health():
-    return {"status": "healthy"}
+    # Liveness: the process is serving; readiness is reported separately
+    status = {"status": "healthy", "ready": registry is not None}
+    if registry is not None:
+        status["index_version"] = registry.default.index_version
+        status["catalogs"] = registry.stats()
+        status["reload"] = {"in_progress": reload_lock.locked(), **reload_status}
+        status["llm"] = registry.default.llm_status()
+        status["rerank"] = registry.default.rerank_status()
+    if startup_error:
+        status["startup_error"] = startup_error
+    return status
 
-@router.post("/recommend")
-def recommend(req: RecommendRequest):
-    # Get explanation/recommendation from LLM
-    explanation = engine.recommend(req.query)
-    
-    # Get raw search results for the list
-    docs = engine.search(req.query, k=10)
-    
-    results = []
-    for doc in docs:
-        meta = doc.metadata
-        # Handle test_type splitting if it's a string
-        test_type = meta.get("test_type", "")
-        if isinstance(test_type, str):
-            test_type = test_type.split(",")
-            
-        results.append({
-            "url": meta.get("url", ""),
-            "name": meta.get("name", ""),
-            "description": meta.get("description", ""),
-            "test_type": test_type,
-            "duration": meta.get("duration", 0),
-            "remote_support": meta.get("remote_support", "Yes"),
-            "adaptive_support": meta.get("adaptive_support", "No")
-        })
+@router.get("/metrics")
+def metrics():
+    # Prometheus text format: stage / request latency histograms, LLM and cache counters, index gauges
+    return Response(content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+@router.get("/ready")
+def ready():
+    _get_registry()
+    return {"status": "ready"}
+
+@router.post("/admin/reload")
+async def admin_reload(catalog: str | None = None, x_admin_token: str | None = Header(None)):
+    # Disabled unless ADMIN_TOKEN is set in the environment
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token or x_admin_token != admin_token:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    previous = (await _get_engine(catalog)).index_version
+    try:
+        # Loads in a worker thread; requests keep being served by the current engine
+        reloaded = await asyncio.to_thread(_reload_engine, catalog)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
+    if not reloaded:
+        raise HTTPException(status_code=409, detail="A reload is already in progress.")
+    return {
+        "status": "reloaded",
+        "catalog": catalog or registry.default_catalog,
+        "previous_version": previous,
+        "index_version": registry.get(catalog).index_version
+    }
+
+def _projection(fields):
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def _results_json(current_engine, retrieval, fields=None):
+    # Assembled from the JSON precomputed per assessment at index load
+    with timed("format"):
+        return join_array(current_engine.payloads.json_many(retrieval.rows, fields))
+
+def _json_response(fragments):
+    return Response(content=join_object(fragments), media_type="application/json")
 
+def _retrieve_options(req):
     return {
-        "recommended_assessments": results,
-        "explanation": explanation
+        "filters": req.filters.to_filters() if req.filters is not None else None,
+        "mode": req.search_mode,
+        "rerank": req.rerank,
+        "diversity": req.diversity.to_options() if req.diversity is not None else None
     }
+
+def _sse(event, data):
+    # ``data`` is already serialized JSON bytes
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+@router.post("/recommend")
+async def recommend(req: RecommendRequest, fields: str | None = None):
+    # Retrieve once; the same documents feed the LLM and the result list.
+    # The LLM call is awaited, so it does not hold a threadpool worker.
+    projection = _projection(fields)
+    current_engine = await _get_engine(req.catalog)
+    explanation, retrieval = await current_engine.arecommend(req.query, **_retrieve_options(req))
+
+    return _json_response([
+        b'"recommended_assessments":' + _results_json(current_engine, retrieval, projection),
+        b'"explanation":' + dumps(explanation),
+        b'"index_version":' + dumps(current_engine.index_version)
+    ])
+
+@router.post("/recommend/stream")
+async def recommend_stream(req: RecommendRequest, fields: str | None = None):
+    # Retrieval happens before the response starts so errors surface as HTTP errors
+    projection = _projection(fields)
+    current_engine = await _get_engine(req.catalog)
+    retrieval = await asyncio.to_thread(current_engine.retrieve, req.query, TOP_K, **_retrieve_options(req))
+
+    async def events():
+        yield _sse("assessments", join_object([
+            b'"recommended_assessments":' + _results_json(current_engine, retrieval, projection),
+            b'"index_version":' + dumps(current_engine.index_version)
+        ]))
+        try:
+            async for chunk in current_engine.astream_explanation(req.query, retrieval):
+                yield _sse("explanation", dumps({"text": chunk}))
+        except StreamInterruptedError as e:
+            # The explanation so far is truncated; clients replace it with the fallback text
+            yield _sse("error", dumps({"error": str(e), "fallback": e.fallback}))
+        yield _sse("done", b"{}")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.post("/recommend/batch")
+async def recommend_batch(req: BatchRecommendRequest, fields: str | None = None):
+    projection = _projection(fields)
+    current_engine = await _get_engine(req.catalog)
+    # Blank queries are reported per item and kept out of the shared encode
+    valid = [i for i, query in enumerate(req.queries) if query.strip()]
+    retrievals = await asyncio.to_thread(
+        current_engine.retrieve_many, [req.queries[i] for i in valid], TOP_K, **_retrieve_options(req)
+    )
+    by_position = dict(zip(valid, retrievals))
+
+    semaphore = asyncio.Semaphore(req.max_concurrency)
+
+    async def explain(retrieval):
+        async with semaphore:
+            explanation, _ = await current_engine.arecommend(retrieval.query, retrieval=retrieval)
+            return explanation
+
+    explanations = {}
+    if req.explain:
+        outcomes = await asyncio.gather(
+            *(explain(by_position[i]) for i in valid), return_exceptions=True
+        )
+        explanations = dict(zip(valid, outcomes))
+
+    results = []
+    for i, query in enumerate(req.queries):
+        assessments, explanation, error = b"[]", None, None
+        if i not in by_position:
+            error = "Query must not be empty."
+        else:
+            assessments = _results_json(current_engine, by_position[i], projection)
+            explanation = explanations.get(i)
+            if isinstance(explanation, Exception):
+                explanation, error = None, f"Explanation failed: {explanation}"
+        results.append(join_object([
+            b'"query":' + dumps(query),
+            b'"recommended_assessments":' + assessments,
+            b'"explanation":' + dumps(explanation),
+            b'"error":' + dumps(error)
+        ]))
+
+    return _json_response([
+        b'"results":' + join_array(results),
+        b'"index_version":' + dumps(current_engine.index_version)
+    ])
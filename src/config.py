@@ -1,4 +1,123 @@
 CATALOG_PATH = "data/shl_products.json"
 TOP_K = 10
+
+# Catalogs served by the API, selected per request with "catalog". Ids not
+# listed here resolve to CATALOGS_DIR/<id>/ (index in faiss_index/, optional
+# catalog.json/.csv/.xlsx to build it from)
+DEFAULT_CATALOG = "shl"
+CATALOGS = {
+    "shl": {"index_path": "data/faiss_index", "catalog_path": CATALOG_PATH}
+}
+CATALOGS_DIR = "data/catalogs"
+# Loaded catalog engines are evicted least-recently-used beyond either bound;
+# the MB bound is an estimate (index files plus payloads, snippets, BM25 and filter bitsets)
+CATALOG_CACHE_MAX_ENGINES = 8
+CATALOG_CACHE_MAX_MB = 2048
+# Retry-After (seconds) sent with the 503 while a new catalog's index is built in the background
+CATALOG_BUILD_RETRY_AFTER_S = 30
+
+# "dense" (vectors only) or "hybrid" (vectors + BM25, reciprocal rank fusion)
+SEARCH_MODE = "dense"
+# Candidates taken from each ranking before fusion, and their weights
+HYBRID_CANDIDATES = 50
+HYBRID_DENSE_WEIGHT = 1.0
+HYBRID_LEXICAL_WEIGHT = 1.0
+RRF_K = 60
+
+# Queries longer than LONG_QUERY_WORDS are split into sentence / bullet
+# segments that are encoded in one batch and searched together
+LONG_QUERY_WORDS = 48
+MAX_QUERY_SEGMENTS = 16
+
+# "single" embeds one (truncated) text per assessment; "chunked" also embeds
+# overlapping passages and pools passage hits back to assessments
+INDEX_MODE = "single"
+CHUNK_WORDS = 128
+CHUNK_OVERLAP = 32
+CHUNK_POOLING = "max"  # or "sum"
+# Passages fetched per requested result before pooling
+CHUNK_CANDIDATE_FACTOR = 4
+
+# Optional cross-encoder rerank of the top RERANK_TOP_N candidates; skipped
+# when the estimated scoring time exceeds RERANK_BUDGET_MS
+RERANK_ENABLED = False
+RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RERANK_TOP_N = 20
+RERANK_BUDGET_MS = 150
+RERANK_BATCH_SIZE = 32
+RERANK_CACHE_SIZE = 20000
+
+# Optional MMR diversification of the final results (per request in the API):
+# DIVERSITY_CANDIDATES are re-selected trading relevance (DIVERSITY_LAMBDA = 1.0)
+# against similarity to results already chosen, using the indexed vectors.
+# DIVERSITY_MAX_PER_TYPE caps results per test type code (None = no cap)
+DIVERSITY_ENABLED = False
+DIVERSITY_LAMBDA = 0.7
+DIVERSITY_CANDIDATES = 30
+# Wider pool when test type quotas are set, so k results remain after capping
+DIVERSITY_QUOTA_CANDIDATES = 100
+DIVERSITY_MAX_PER_TYPE = None
+
+# FAISS index type: "flat", "hnsw", "ivfpq", or "auto" to pick by catalog size.
+# All types search by cosine similarity (inner product on normalized vectors)
+INDEX_TYPE = "auto"
+INDEX_HNSW_MIN_ITEMS = 20000
+INDEX_IVFPQ_MIN_ITEMS = 1000000
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+IVF_NPROBE = 16
+PQ_M = 48
+PQ_NBITS = 8
+# IVF-PQ fetches k * IVF_REFINE_FACTOR candidates and re-scores them exactly
+IVF_REFINE_FACTOR = 4
+
+# Index versions kept on disk by incremental updates (see src/ingestion/update_index.py)
+INDEX_KEEP_VERSIONS = 3
+# The API checks for a newly published index version this often and swaps it
+# in without a restart (0 disables; POST /admin/reload still works)
+INDEX_WATCH_INTERVAL_S = 30
+
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 GEMINI_MODEL = "gemini-1.5-flash"
+
+# LLM deadline and circuit breaker: after LLM_BREAKER_FAILURES consecutive
+# failures/timeouts, skip the LLM for LLM_BREAKER_RESET_S before probing again
+LLM_TIMEOUT_S = 15.0
+LLM_BREAKER_FAILURES = 5
+LLM_BREAKER_RESET_S = 30.0
+# Worker threads used to enforce the deadline on synchronous LLM calls
+LLM_MAX_WORKERS = 16
+# Token budget for the assessments in the LLM prompt: per-assessment snippets
+# (descriptions cut to CONTEXT_DESCRIPTION_WORDS) are packed in rank order
+LLM_CONTEXT_TOKENS = 1500
+CONTEXT_DESCRIPTION_WORDS = 60
+
+# Cache of LLM explanations; set a cosine threshold (e.g. 0.95) to also reuse
+# answers for near-duplicate queries that retrieved the same documents
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL_S = 3600
+RESPONSE_CACHE_SIMILARITY = None
+
+# Per-request stage timings in a Server-Timing response header: "off",
+# "request" (only when the client sends "X-Server-Timing: 1") or "always".
+# Aggregated stage latencies are always exported on GET /metrics
+SERVER_TIMING = "request"
+
+# POST /recommend/batch limits
+BATCH_MAX_QUERIES = 100
+BATCH_LLM_CONCURRENCY = 4
+
+# LRU of query embeddings; set a path to persist it across restarts
+EMBEDDING_CACHE_SIZE = 4096
+EMBEDDING_CACHE_PATH = None
+
+# Concurrent query encodes arriving within this window share one batch (0 disables)
+ENCODE_BATCH_WINDOW_MS = 3
+ENCODE_MAX_BATCH = 32
+
+# Optional JSONL log of fallback recommendations, written off the request path
+RESULT_SINK_ENABLED = False
+RESULT_SINK_PATH = "outputs/results.jsonl"
+RESULT_SINK_QUEUE_SIZE = 1000
+RESULT_SINK_BATCH_SIZE = 50
@@ -0,0 +1,70 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchingEncoder:
+    """Coalesce concurrent single-query encodes into batched ``model.encode`` calls.
+
+    Callers block in ``encode()`` while a background thread collects requests
+    arriving within ``window_ms`` of the first one (up to ``max_batch``),
+    encodes the unique texts in one call and resolves every waiter.
+    """
+
+    def __init__(self, model, window_ms=3, max_batch=32):
+        self.model = model
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.batches = 0
+        self.encoded = 0
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+        self._thread.start()
+
+    def encode(self, text):
+        future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._encode_batch(batch)
+                    return
+                batch.append(item)
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch):
+        # Identical queries in the same window are encoded once
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            vectors = self.model.encode(texts).astype("float32")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.encoded += len(texts)
+        positions = {text: i for i, text in enumerate(texts)}
+        for text, future in batch:
+            future.set_result(vectors[positions[text]])
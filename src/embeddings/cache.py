@@ -0,0 +1,91 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU of query vectors keyed on ``(model_name, normalized_query)``.
+
+    When ``path`` is given the cache is loaded from an ``.npz`` file on start
+    and written back by ``save()``, so warm entries survive restarts.
+    """
+
+    def __init__(self, max_size=4096, path=None):
+        self.max_size = max_size
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def get(self, key):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key, vector):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self):
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                models, texts, vectors = data["models"], data["texts"], data["vectors"]
+            with self._lock:
+                for model, text, vector in zip(models, texts, vectors):
+                    self._entries[(str(model), str(text))] = vector
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            print(f"Loaded {len(self._entries)} cached query embeddings from {self.path}")
+        except Exception as e:
+            print(f"Error loading embedding cache from {self.path}: {e}")
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            items = list(self._entries.items())
+        if not items:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    models=np.array([model for (model, _), _ in items]),
+                    texts=np.array([text for (_, text), _ in items]),
+                    vectors=np.stack([vector for _, vector in items])
+                )
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving embedding cache to {self.path}: {e}")
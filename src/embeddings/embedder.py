@@ -1,8 +1,20 @@
-from sentence_transformers import SentenceTransformer
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer, CrossEncoder
+
+def load_embedder(model_name: str) -> "SentenceTransformer":
+    # sentence_transformers pulls in torch; import it only when a model is loaded
+    from sentence_transformers import SentenceTransformer
 
-def load_embedder(model_name: str) -> SentenceTransformer:
     print(f"Loading embedding model: {model_name}...")
     return SentenceTransformer(model_name)
 
-def embed_texts(model: SentenceTransformer, texts: list) -> list:
+def load_cross_encoder(model_name: str) -> "CrossEncoder":
+    from sentence_transformers import CrossEncoder
+
+    print(f"Loading cross-encoder model: {model_name}...")
+    return CrossEncoder(model_name)
+
+def embed_texts(model: "SentenceTransformer", texts: list) -> list:
     return model.encode(texts, show_progress_bar=True).astype("float32")
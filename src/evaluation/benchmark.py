@@ -0,0 +1,360 @@
+import sys
+import os
+import json
+import time
+import random
+import socket
+import asyncio
+import hashlib
+import platform
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Everything (embedding model included) must come from the local cache
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.ingestion.load_catalog import load_catalog
+from src.config import CATALOG_PATH
+
+DATASET_PATH = "data/Gen_AI Dataset.xlsx"
+ENDPOINTS = ("recommend", "recommend_stream", "recommend_batch")
+BATCH_SIZE = 8
+
+
+class FakeLLM(BaseChatModel):
+    """Deterministic stand-in for Gemini with a fixed latency and failure rate.
+
+    Whether a call fails depends only on the prompt and ``seed``, so the
+    same query mix fails the same way on every run.
+    """
+    latency_ms: float = 800.0
+    failure_rate: float = 0.0
+    seed: int = 0
+
+    @property
+    def _llm_type(self):
+        return "benchmark-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency_ms / 1000)
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._result(messages)
+
+    def _result(self, messages):
+        prompt = messages[-1].content
+        digest = hashlib.sha1(f"{self.seed}:{prompt}".encode("utf-8")).hexdigest()
+        if int(digest[:8], 16) / 2 ** 32 < self.failure_rate:
+            raise RuntimeError("Simulated LLM failure")
+        names = [line[len("Name: "):] for line in prompt.splitlines() if line.startswith("Name: ")]
+        text = "Recommended Assessments\n" + "".join(f"{i}. {name}\n" for i, name in enumerate(names, 1))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+def load_queries(catalog_path=CATALOG_PATH, dataset_path=DATASET_PATH, seed=0):
+    """Query mix: catalog names and description openings plus the labelled dataset queries."""
+    queries = []
+    df = load_catalog(catalog_path)
+    for _, row in df.iterrows():
+        if pd.notna(row.get("name")) and row["name"]:
+            queries.append({"query": str(row["name"]).split(" | ")[0], "source": "catalog_name"})
+        if pd.notna(row.get("description")) and len(str(row["description"])) > 20:
+            queries.append({"query": str(row["description"])[:100], "source": "catalog_description"})
+
+    if Path(dataset_path).exists():
+        # Job descriptions and hiring requests, often long enough to be segmented
+        for sheet, source in (("Train-Set", "dataset_train"), ("Test-Set", "dataset_test")):
+            dataset = pd.read_excel(dataset_path, sheet_name=sheet)
+            for query in dataset["Query"].dropna().astype(str).unique():
+                queries.append({"query": query, "source": source})
+    else:
+        print(f"Dataset not found at {dataset_path}; using catalog queries only")
+
+    random.Random(seed).shuffle(queries)
+    return queries
+
+
+def serve(port, latency_ms, failure_rate, seed, response_cache):
+    """Run app/main.py with the fake LLM (used in the benchmark's server process)."""
+    import uvicorn
+    import src.config as config
+
+    # Explanations would otherwise be served from cache after the first pass
+    if not response_cache:
+        config.RESPONSE_CACHE_SIZE = 0
+    config.INDEX_WATCH_INTERVAL_S = 0
+    config.SERVER_TIMING = "off"
+
+    from src.api import routes
+    from app.main import app
+
+    routes.engine_llm = FakeLLM(latency_ms=latency_ms, failure_rate=failure_rate, seed=seed)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_server(args, log_path, timeout=300):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    command = [
+        sys.executable, "-m", "src.evaluation.benchmark", "--serve", "--port", str(port),
+        "--llm-latency-ms", str(args.llm_latency_ms), "--llm-failure-rate", str(args.llm_failure_rate),
+        "--seed", str(args.seed)
+    ]
+    if args.response_cache:
+        command.append("--response-cache")
+    log = open(log_path, "w", encoding="utf-8")
+    process = subprocess.Popen(command, cwd=project_root, stdout=log, stderr=subprocess.STDOUT)
+    # The child process keeps its own handle
+    log.close()
+    base_url = f"http://127.0.0.1:{port}"
+
+    import httpx
+
+    # The server is live before the engine is warm; wait for readiness
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=2.0).status_code == 200:
+                return process, base_url
+            health = httpx.get(f"{base_url}/health", timeout=2.0).json()
+            if health.get("startup_error"):
+                break
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"Server did not become ready; see {log_path}")
+
+
+def llm_counters(base_url):
+    """LLM outcome and fallback counters from the server's /metrics."""
+    import httpx
+    from prometheus_client.parser import text_string_to_metric_families
+
+    counters = {}
+    for family in text_string_to_metric_families(httpx.get(f"{base_url}/metrics", timeout=10.0).text):
+        for sample in family.samples:
+            if sample.name == "shl_llm_calls_total":
+                counters[sample.labels["outcome"]] = sample.value
+            elif sample.name == "shl_llm_fallbacks_total":
+                counters["fallback"] = sample.value
+    return counters
+
+
+def _payload(endpoint, queries, i):
+    if endpoint == "recommend_batch":
+        return {"queries": [queries[(i * BATCH_SIZE + j) % len(queries)]["query"] for j in range(BATCH_SIZE)],
+                "explain": True}
+    return {"query": queries[i % len(queries)]["query"]}
+
+
+async def _request(client, endpoint, payload):
+    # Returns (ok, seconds, seconds_to_first_byte)
+    path = "/" + endpoint.replace("_", "/")
+    started = time.perf_counter()
+    if endpoint == "recommend_stream":
+        first = None
+        async with client.stream("POST", path, json=payload) as response:
+            async for _ in response.aiter_bytes():
+                if first is None:
+                    first = time.perf_counter() - started
+        return response.status_code == 200, time.perf_counter() - started, first
+    response = await client.post(path, json=payload)
+    return response.status_code == 200, time.perf_counter() - started, None
+
+
+async def run_level(base_url, endpoint, queries, concurrency, requests, offset=0):
+    """Send ``requests`` requests to ``endpoint`` from ``concurrency`` concurrent workers."""
+    import httpx
+
+    latencies, first_bytes = [], []
+    errors = 0
+    next_request = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            for i in next_request:
+                try:
+                    ok, seconds, first = await _request(client, endpoint, _payload(endpoint, queries, offset + i))
+                except httpx.HTTPError:
+                    ok, seconds, first = False, None, None
+                if not ok:
+                    errors += 1
+                    continue
+                latencies.append(seconds)
+                if first is not None:
+                    first_bytes.append(first)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    result = {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": requests,
+        "ok": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": _percentiles(latencies)
+    }
+    if first_bytes:
+        result["first_byte_ms"] = _percentiles(first_bytes)
+    return result
+
+
+def _percentiles(seconds):
+    if not seconds:
+        return None
+    values = np.asarray(seconds) * 1000
+    return {
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p95": round(float(np.percentile(values, 95)), 2),
+        "p99": round(float(np.percentile(values, 99)), 2),
+        "mean": round(float(values.mean()), 2),
+        "max": round(float(values.max()), 2)
+    }
+
+
+def compare(results, baseline, max_regression):
+    """Regressions of p95 latency or throughput beyond ``max_regression`` (a fraction) versus ``baseline``."""
+    previous = {(run["endpoint"], run["concurrency"]): run for run in baseline["results"]}
+    regressions = []
+    for run in results:
+        old = previous.get((run["endpoint"], run["concurrency"]))
+        if old is None or not run["latency_ms"] or not old["latency_ms"]:
+            continue
+        p95, old_p95 = run["latency_ms"]["p95"], old["latency_ms"]["p95"]
+        label = f"{run['endpoint']} @ {run['concurrency']}"
+        print(f"{label:<28} p95 {old_p95:>9.1f} -> {p95:>9.1f} ms   "
+              f"throughput {old['throughput_rps']:>7.2f} -> {run['throughput_rps']:>7.2f} req/s")
+        if p95 > old_p95 * (1 + max_regression):
+            regressions.append(f"{label}: p95 {old_p95} -> {p95} ms")
+        if run["throughput_rps"] < old["throughput_rps"] * (1 - max_regression):
+            regressions.append(f"{label}: throughput {old['throughput_rps']} -> {run['throughput_rps']} req/s")
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=project_root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(args):
+    queries = load_queries(args.catalog, args.dataset, seed=args.seed)
+    sources = pd.Series([query["source"] for query in queries]).value_counts().to_dict()
+    print(f"Loaded {len(queries)} queries: {sources}")
+
+    output = Path(args.output or f"outputs/benchmarks/benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    log_path = output.with_suffix(".server.log")
+    print(f"Starting the API (fake LLM: {args.llm_latency_ms} ms, {args.llm_failure_rate:.0%} failures)...")
+    process, base_url = start_server(args, log_path)
+
+    results = []
+    try:
+        # Warm every endpoint once so first-request costs stay out of the numbers
+        for endpoint in args.endpoints:
+            asyncio.run(run_level(base_url, endpoint, queries, 1, 2))
+        for endpoint in args.endpoints:
+            for concurrency in args.concurrency:
+                before = llm_counters(base_url)
+                run = asyncio.run(run_level(base_url, endpoint, queries, concurrency, args.requests))
+                after = llm_counters(base_url)
+                # Simulated failures surface as fallback responses, not HTTP errors
+                run["llm"] = {key: int(after[key] - before.get(key, 0)) for key in after if after[key] != before.get(key, 0)}
+                results.append(run)
+                latency = run["latency_ms"] or {}
+                print(f"{endpoint:<18} c={concurrency:<4} {run['throughput_rps']:>8.2f} req/s   "
+                      f"p50 {latency.get('p50', 0):>8.1f}  p95 {latency.get('p95', 0):>8.1f}  "
+                      f"p99 {latency.get('p99', 0):>8.1f} ms   errors {run['errors']}   llm {run['llm']}")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "settings": {
+            "endpoints": list(args.endpoints),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "batch_size": BATCH_SIZE,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_failure_rate": args.llm_failure_rate,
+            "response_cache": args.response_cache,
+            "seed": args.seed
+        },
+        "queries": {"count": len(queries), "sources": sources},
+        "results": results
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print("Regressions beyond the allowed threshold:\n  " + "\n  ".join(regressions))
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline load test of the API with a fake LLM")
+    parser.add_argument("--endpoints", nargs="*", default=list(ENDPOINTS), choices=ENDPOINTS)
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint and concurrency level")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--response-cache", action="store_true",
+                        help="keep the explanation cache on (repeated queries then skip the LLM)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--catalog", default=CATALOG_PATH)
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--output", default=None, help="defaults to outputs/benchmarks/benchmark-<time>.json")
+    parser.add_argument("--baseline", default=None, help="earlier results to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="allowed p95 / throughput regression versus the baseline (fraction)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=8000, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.llm_latency_ms, args.llm_failure_rate, args.seed, args.response_cache)
+    else:
+        sys.exit(main(args))
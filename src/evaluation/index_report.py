@@ -0,0 +1,109 @@
+import sys
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.vector_store.native_store import NativeIndexStore
+from src.vector_store.versions import resolve_index_path
+from src.vector_store.faiss_index import (
+    build_faiss_index, index_params, normalize, search_with_refine, INDEX_TYPES
+)
+
+
+def synthetic_vectors(base, count, noise=0.015, seed=0):
+    """Grow ``base`` to ``count`` vectors by mixing and jittering catalog vectors.
+
+    Keeps the neighbourhood structure of real embeddings while letting the
+    report run at client-catalog scale without embedding anything.
+    """
+    rng = np.random.default_rng(seed)
+    first = base[rng.integers(0, len(base), size=count)]
+    second = base[rng.integers(0, len(base), size=count)]
+    mix = rng.uniform(0.0, 0.5, size=(count, 1)).astype("float32")
+    vectors = (1 - mix) * first + mix * second
+    vectors += rng.normal(0.0, noise, size=vectors.shape).astype("float32")
+    return normalize(vectors)
+
+
+def index_report(vectors, queries, k=10, index_types=INDEX_TYPES):
+    """Recall@k against exact flat search and per-query latency for each index type.
+
+    Searches go through ``search_with_refine`` exactly as ``NativeIndexStore``
+    does, so IVF-PQ numbers include the exact re-scoring step.
+    """
+    params = index_params(len(vectors), vectors.shape[1], "flat")
+    baseline = build_faiss_index(vectors, params)
+    _, truth = baseline.search(queries, k)
+
+    rows = []
+    for index_type in index_types:
+        params = index_params(len(vectors), vectors.shape[1], index_type)
+        started = time.perf_counter()
+        index = build_faiss_index(vectors, params)
+        build_s = time.perf_counter() - started
+
+        latencies = []
+        found = np.zeros_like(truth)
+        for i, query in enumerate(queries):
+            started = time.perf_counter()
+            _, indices = search_with_refine(index, vectors, query.reshape(1, -1), k, params.get("refine"))
+            latencies.append((time.perf_counter() - started) * 1000)
+            found[i] = indices[0]
+
+        recall = np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found.tolist(), truth.tolist())])
+        rows.append({
+            "type": index_type,
+            "params": params,
+            "build_s": round(build_s, 3),
+            f"recall@{k}": round(float(recall), 4),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 4)
+        })
+    return rows
+
+
+def main(index_path="data/faiss_index", sizes=(None,), num_queries=200, k=10, output=None):
+    store = NativeIndexStore(resolve_index_path(index_path))
+    base = normalize(store.vectors)
+    rng = np.random.default_rng(1)
+
+    report = []
+    for size in sizes:
+        vectors = base if size is None else synthetic_vectors(base, size)
+        # Queries are perturbed catalog vectors, so every query has real neighbours
+        queries = synthetic_vectors(base, num_queries, noise=0.02, seed=int(rng.integers(1 << 31)))
+        # IVF-PQ needs enough vectors to train its quantizers
+        types = [t for t in INDEX_TYPES if t != "ivfpq" or len(vectors) >= 10000]
+        print(f"\n{len(vectors)} vectors, {num_queries} queries, k={k}")
+        print(f"{'type':<8}{'build s':>10}{'recall':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for row in index_report(vectors, queries, k=k, index_types=types):
+            print(f"{row['type']:<8}{row['build_s']:>10}{row[f'recall@{k}']:>10}{row['p50_ms']:>10}{row['p95_ms']:>10}")
+            report.append({"vectors": len(vectors), **row})
+
+    if output:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recall vs latency of FAISS index types against exact flat search")
+    parser.add_argument("--index", default="data/faiss_index")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[],
+                        help="synthetic catalog sizes to test in addition to the real index")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--output", default="outputs/index_report.json")
+    args = parser.parse_args()
+
+    main(args.index, sizes=[None, *args.sizes], num_queries=args.queries, k=args.k, output=args.output)
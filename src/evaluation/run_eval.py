@@ -12,6 +12,7 @@ if str(project_root) not in sys.path:
 
 from src.rag.rag_engine import AssessmentRecommendationEngine
 from src.evaluation.recall import recall_at_k, mean_recall_at_k
+from src.vector_store.filters import SearchFilters
 from src.config import CATALOG_PATH
 
 def load_ground_truth():
@@ -46,7 +47,7 @@ def load_ground_truth():
                 
     return test_cases
 
-def evaluate(k=10):
+def evaluate(k=10, mode=None, filters=None):
     print("Loading Engine...")
     engine = AssessmentRecommendationEngine()
     
@@ -62,9 +63,9 @@ def evaluate(k=10):
         query = case['query']
         relevant = case['relevant_ids']
         
-        results = engine.search(query, k=k)
+        retrieval = engine.retrieve(query, k=k, filters=filters, mode=mode)
         
-        predicted = [doc.metadata.get('name') for doc in results]
+        predicted = [doc.metadata.get('name') for doc in retrieval.docs]
         
         score = recall_at_k(predicted, relevant, k=k)
         
@@ -76,7 +77,7 @@ def evaluate(k=10):
     mean_recall_title = mean_recall_at_k(title_recalls, k=k) if title_recalls else 0
     mean_recall_desc = mean_recall_at_k(desc_recalls, k=k) if desc_recalls else 0
     
-    print(f"\nResults for k={k}:")
+    print(f"\nResults for k={k} ({mode or engine.search_mode} search{', filtered' if filters else ''}):")
     print(f"Mean Recall (Title Queries): {mean_recall_title:.4f}")
     print(f"Mean Recall (Description Queries): {mean_recall_desc:.4f}")
     
@@ -124,6 +125,15 @@ def evaluate(k=10):
     return mean_recall_title, mean_recall_desc
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recall@k of retrieval over the catalog's title and description queries")
+    parser.add_argument("--mode", default=None, choices=["dense", "hybrid"], help="defaults to SEARCH_MODE")
+    parser.add_argument("--filters", default=None,
+                        help='SearchFilters as JSON, e.g. \'{"remote_support": true, "max_duration": 30}\'')
+    args = parser.parse_args()
+    filters = SearchFilters(**json.loads(args.filters)) if args.filters else None
+
     # Clear previous results file if it exists to start fresh
     output_dir = Path(__file__).resolve().parents[2] / "outputs"
     output_file = output_dir / "evaluation_results.csv"
@@ -137,5 +147,5 @@ if __name__ == "__main__":
     if output_file_3.exists():
         output_file_3.unlink()
         
-    evaluate(k=5)
-    evaluate(k=10)
+    evaluate(k=5, mode=args.mode, filters=filters)
+    evaluate(k=10, mode=args.mode, filters=filters)
@@ -1,6 +1,7 @@
 import sys
 import re
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 try:
@@ -14,6 +15,18 @@ except ModuleNotFoundError:
 
 DEFAULT_CATALOG_PATH = "data/processed/shl_catalog_clean.csv"
 
+# Compiled once; applied column-wise with pandas .str methods
+COMPLETION_TIME_RE = re.compile(r"Approximate Completion Time in minutes\s*=\s*(.+?)(?:\s+Test Type|$)", re.IGNORECASE)
+TRAILING_MINUTES_RE = re.compile(r"\s*minutes\.?$", re.IGNORECASE)
+# Decimals too: numeric columns with blanks are read as float ("36.0")
+MINUTES_RE = re.compile(r"(\d+(?:\.\d+)?)")
+# "max 20", "up to 20", "under 20": only an upper bound is stated
+UPPER_BOUND_RE = re.compile(r"^\s*(?:max(?:imum)?\.?|up to|under|less than|within|<=?)\s*\d", re.IGNORECASE)
+UNTIMED_RE = re.compile(r"untimed|variable", re.IGNORECASE)
+
+# Typed duration columns produced by normalize_durations()
+DURATION_FIELDS = ["duration_min", "duration_max", "duration_untimed"]
+
 
 def _resolve_path(path: str | Path) -> Path:
     p = Path(path)
@@ -24,6 +37,41 @@ def _resolve_path(path: str | Path) -> Path:
     return project_root / p
 
 
+def normalize_durations(duration: pd.Series) -> pd.DataFrame:
+    """Parse free-text durations into typed columns.
+
+    ``duration_min`` / ``duration_max`` are whole minutes (-1 when unknown;
+    ``duration_min`` is 0 for an upper bound only, e.g. "max 20"),
+    ``duration_untimed`` flags "Untimed"/"Variable" entries and
+    ``duration_display`` is the text shown to users ("30 minutes",
+    "15-35 minutes", "Up to 20 minutes", "Untimed (approx. 25 minutes)", "N/A").
+    """
+    text = duration.fillna("").astype(str)
+    numbers = text.str.extractall(MINUTES_RE)[0].astype(float).round().astype(int).groupby(level=0)
+    low = numbers.min().reindex(text.index).fillna(-1).astype("int32")
+    high = numbers.max().reindex(text.index).fillna(-1).astype("int32")
+    low[text.str.contains(UPPER_BOUND_RE) & (high >= 0)] = 0
+    untimed = text.str.contains(UNTIMED_RE)
+
+    known = high >= 0
+    minutes = low.astype(str) + " minutes"
+    ranged = low.astype(str) + "-" + high.astype(str) + " minutes"
+    up_to = "Up to " + high.astype(str) + " minutes"
+    timed = pd.Series(np.select([low == high, low == 0], [minutes, up_to], default=ranged), index=text.index)
+    display = pd.Series(np.select(
+        [untimed & known, untimed, known],
+        ["Untimed (approx. " + timed + ")", "Untimed", timed],
+        default="N/A"
+    ), index=text.index)
+
+    return pd.DataFrame({
+        "duration_min": low,
+        "duration_max": high,
+        "duration_untimed": untimed,
+        "duration_display": display
+    })
+
+
 def load_catalog(path: str | Path = DEFAULT_CATALOG_PATH) -> pd.DataFrame:
     file_path = _resolve_path(path)
     
@@ -92,27 +140,26 @@ def load_catalog(path: str | Path = DEFAULT_CATALOG_PATH) -> pd.DataFrame:
     # Extract duration from description if missing
     # Some datasets embed the duration in the description text
     if "description" in df.columns:
-        def extract_duration(text):
-            if not isinstance(text, str):
-                return None
-            # Look for "Approximate Completion Time in minutes = <value>"
-            match = re.search(r"Approximate Completion Time in minutes\s*=\s*(.+?)(?:\s+Test Type|$)", text, re.IGNORECASE)
-            if match:
-                val = match.group(1).strip()
-                # Remove trailing "minutes" if present
-                val = re.sub(r"\s*minutes\.?$", "", val, flags=re.IGNORECASE)
-                return val
-            return None
-
         # If duration column doesn't exist, create it
         if "duration" not in df.columns:
             df["duration"] = ""
+        # An all-"N/A" column is read as float NaN; keep it textual
+        df["duration"] = df["duration"].astype(object)
             
         # Fill missing duration where it is NaN or empty
         mask = df["duration"].isna() | (df["duration"] == "") | (df["duration"] == "N/A")
-        extracted = df.loc[mask, "description"].apply(extract_duration)
+        # Look for "Approximate Completion Time in minutes = <value>" and drop a trailing "minutes"
+        extracted = (
+            df.loc[mask, "description"].astype(str)
+            .str.extract(COMPLETION_TIME_RE, expand=False)
+            .str.strip()
+            .str.replace(TRAILING_MINUTES_RE, "", regex=True)
+        )
         df.loc[mask, "duration"] = extracted.fillna("N/A")
 
+    if "duration" in df.columns:
+        df = df.join(normalize_durations(df["duration"]))
+
     # Create combined text for embedding
     # We combine name, description, and test type to give the model full context
     df["combined_text"] = (
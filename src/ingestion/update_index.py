@@ -0,0 +1,264 @@
+import sys
+import time
+import shutil
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.ingestion.load_catalog import load_catalog, DURATION_FIELDS
+from src.embeddings.embedder import load_embedder, embed_texts
+from src.vector_store.native_store import (
+    NativeIndexStore, catalog_columns, TEXT_FIELD, ID_FIELD, CONTENT_HASH_FIELD, ROW_HASH_FIELD
+)
+from src.vector_store.bm25 import BM25Index, BM25_FILE
+from src.vector_store.versions import (
+    current_version, resolve_index_path, next_version, staging_path, publish_version
+)
+from src.utils.text import chunk_text
+from src.config import (
+    CATALOG_PATH, EMBEDDING_MODEL, INDEX_MODE, CHUNK_WORDS, CHUNK_OVERLAP, INDEX_KEEP_VERSIONS
+)
+
+
+@dataclass
+class IndexUpdate:
+    """What an ``update_index`` run changed relative to the previous version."""
+    version: str | None
+    path: Path
+    added: int = 0
+    changed: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    embedded: int = 0
+    published: bool = False
+
+    def summary(self):
+        return (
+            f"{self.added} added, {self.changed} re-embedded, {self.updated} metadata-only, "
+            f"{self.removed} removed, {self.unchanged} unchanged ({self.embedded} texts embedded)"
+        )
+
+
+def content_hashes(texts):
+    return [hashlib.sha1(text.encode("utf-8")).hexdigest() for text in texts]
+
+
+def row_hashes(columns, arrays):
+    fields = sorted(field for field in columns if field not in (CONTENT_HASH_FIELD, ROW_HASH_FIELD))
+    values = [columns[field] for field in fields] + [np.asarray(arrays[field]).tolist() for field in sorted(arrays)]
+    return content_hashes(["\x1f".join(str(value) for value in row) for row in zip(*values)])
+
+
+def _passage_layout():
+    # What a version's passages depend on besides the text
+    if INDEX_MODE != "chunked":
+        return {"mode": INDEX_MODE}
+    return {"mode": INDEX_MODE, "chunk_words": CHUNK_WORDS, "chunk_overlap": CHUNK_OVERLAP}
+
+
+def _stored_layout(store):
+    # Versions written before the layout was recorded: infer the mode from the passages
+    return store.manifest.get("passage_layout", {"mode": "chunked" if store.passage_count else "single"})
+
+
+def update_index(index_path="data/faiss_index", catalog_path=CATALOG_PATH, model=None,
+                 keep=INDEX_KEEP_VERSIONS, force=False):
+    """Bring the index at ``index_path`` in line with the catalog, embedding only what changed.
+
+    Rows are matched to the current version by the hash of their
+    ``combined_text``: matching rows reuse their stored vectors (and
+    passages), everything else is embedded. The result is written as a new
+    version and published atomically; nothing is written when the catalog
+    is unchanged unless ``force`` is set. ``model`` is an already loaded
+    embedder; otherwise one is loaded only if something needs embedding.
+
+    Returns ``(store, update)`` where ``store`` is the current store after
+    the run.
+    """
+    df = load_catalog(catalog_path)
+    columns, arrays = catalog_columns(df, array_fields=DURATION_FIELDS)
+    texts = columns[TEXT_FIELD]
+    # Rows whose text hash is unchanged reuse their vectors; the row hash
+    # fingerprints everything else (caches key documents on it)
+    columns[CONTENT_HASH_FIELD] = content_hashes(texts)
+    columns[ROW_HASH_FIELD] = row_hashes(columns, arrays)
+
+    old_path = resolve_index_path(index_path)
+    old = NativeIndexStore(old_path) if NativeIndexStore.exists(old_path) else None
+    if old is not None and old.manifest.get("embedding_model") not in (None, EMBEDDING_MODEL):
+        print(f"Index was embedded with {old.manifest['embedding_model']}; re-embedding everything")
+        old = None
+
+    update = _diff(old, columns, arrays)
+    reuse = update.pop("reuse")
+    update = IndexUpdate(version=current_version(index_path), path=old_path, **update)
+    layout = _passage_layout()
+    same_layout = old is not None and _stored_layout(old) == layout
+    if old is not None and not same_layout:
+        print(f"Index passages were built for {_stored_layout(old)}, now {layout}; republishing")
+    # Versions written before row hashes or the BM25 file existed, or under
+    # another INDEX_MODE / chunking, are republished once to bring them in line
+    up_to_date = (
+        old is not None and update.version is not None and ROW_HASH_FIELD in old.columns
+        and same_layout and (old.path / BM25_FILE).exists()
+        and not (update.added or update.changed or update.updated or update.removed)
+    )
+    if up_to_date and not force:
+        print(f"Index {update.version} is up to date ({update.unchanged} assessments)")
+        return old, update
+
+    embedder = _LazyEmbedder(model)
+    if old is None:
+        print(f"Embedding {len(texts)} assessments...")
+        vectors = embedder.embed(texts)
+    else:
+        vectors = np.empty((len(texts), old.dim), dtype="float32")
+        kept = reuse >= 0
+        vectors[kept] = old.vectors[reuse[kept]]
+        missing = np.flatnonzero(~kept)
+        if len(missing):
+            print(f"Embedding {len(missing)} new or changed assessments...")
+            vectors[missing] = embedder.embed([texts[i] for i in missing])
+
+    # Old passages are only reusable when they were chunked the same way
+    passages = _passages(texts, reuse, old if same_layout else None, embedder) if INDEX_MODE == "chunked" else None
+    update.embedded = embedder.count
+
+    version = next_version(index_path)
+    staged = staging_path(index_path, version)
+    if staged.exists():
+        shutil.rmtree(staged)
+    NativeIndexStore.build(
+        staged,
+        vectors,
+        columns,
+        arrays=arrays,
+        passages=passages,
+        embedding_model=EMBEDDING_MODEL,
+        info={
+            "version": version,
+            "parent": update.version,
+            "catalog_path": str(catalog_path),
+            "passage_layout": layout,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "changes": {
+                "added": update.added,
+                "changed": update.changed,
+                "updated": update.updated,
+                "removed": update.removed,
+                "unchanged": update.unchanged
+            }
+        }
+    )
+    BM25Index.build(texts).save(staged / BM25_FILE)
+    # Drop our handles on the old version before older versions are pruned
+    del old
+
+    path = publish_version(index_path, version, keep=keep)
+    update.version = version
+    update.path = path
+    update.published = True
+    print(f"Published index {version}: {update.summary()}")
+    return NativeIndexStore(path), update
+
+
+def _diff(old, columns, arrays):
+    ids = columns[ID_FIELD]
+    hashes = columns[CONTENT_HASH_FIELD]
+    if old is None:
+        return {"reuse": np.full(len(ids), -1), "added": len(ids)}
+
+    old_texts = old.columns[TEXT_FIELD].tolist()
+    old_hashes = (
+        old.columns[CONTENT_HASH_FIELD].tolist() if CONTENT_HASH_FIELD in old.columns else content_hashes(old_texts)
+    )
+    old_rows = {doc_id: i for i, doc_id in enumerate(old.columns[ID_FIELD].tolist())}
+    by_hash = {}
+    for i, content_hash in enumerate(old_hashes):
+        by_hash.setdefault(content_hash, i)
+
+    # Vectors depend only on the text, so any row with a known hash is reused
+    reuse = np.array([by_hash.get(content_hash, -1) for content_hash in hashes])
+    new_row_hashes = columns[ROW_HASH_FIELD]
+    if ROW_HASH_FIELD in old.columns:
+        old_row_hashes = old.columns[ROW_HASH_FIELD].tolist()
+    else:
+        old_columns = {field: column.tolist() for field, column in old.columns.items()}
+        old_row_hashes = row_hashes(old_columns, old.arrays)
+
+    counts = {"added": 0, "changed": 0, "updated": 0, "unchanged": 0}
+    for i, doc_id in enumerate(ids):
+        row = old_rows.get(doc_id)
+        if row is None:
+            counts["added"] += 1
+        elif old_hashes[row] != hashes[i]:
+            counts["changed"] += 1
+        elif old_row_hashes[row] != new_row_hashes[i]:
+            counts["updated"] += 1
+        else:
+            counts["unchanged"] += 1
+    counts["removed"] = len(set(old_rows) - set(ids))
+    return {"reuse": reuse, **counts}
+
+
+def _passages(texts, reuse, old, embedder):
+    # Passages of reused rows are copied when the old version has them
+    old_passage_rows = None
+    if old is not None and old.passage_count:
+        old_passage_rows = np.asarray(old.passage_rows)
+        order = np.argsort(old_passage_rows, kind="stable")
+        starts = np.searchsorted(old_passage_rows[order], np.arange(len(old) + 1))
+
+    kept_vectors, kept_rows = [], []
+    new_passages, new_rows = [], []
+    for row, text in enumerate(texts):
+        if old_passage_rows is not None and reuse[row] >= 0:
+            old_row = reuse[row]
+            hits = order[starts[old_row]:starts[old_row + 1]]
+            kept_vectors.append(np.asarray(old.passage_vectors[np.sort(hits)]))
+            kept_rows.extend([row] * len(hits))
+            continue
+        for passage in chunk_text(text, CHUNK_WORDS, CHUNK_OVERLAP):
+            new_passages.append(passage)
+            new_rows.append(row)
+
+    vectors = kept_vectors
+    if new_passages:
+        print(f"Embedding {len(new_passages)} passages...")
+        vectors = kept_vectors + [embedder.embed(new_passages)]
+    return np.concatenate(vectors), kept_rows + new_rows
+
+
+class _LazyEmbedder:
+    # Loads the embedding model on first use, so no-op refreshes never pay for it
+    def __init__(self, model=None):
+        self.model = model
+        self.count = 0
+
+    def embed(self, texts):
+        if self.model is None:
+            self.model = load_embedder(EMBEDDING_MODEL)
+        self.count += len(texts)
+        return embed_texts(self.model, texts)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incrementally update the index from the catalog")
+    parser.add_argument("--index", default="data/faiss_index")
+    parser.add_argument("--catalog", default=CATALOG_PATH)
+    parser.add_argument("--keep", type=int, default=INDEX_KEEP_VERSIONS, help="versions to keep on disk")
+    parser.add_argument("--force", action="store_true", help="publish a new version even if nothing changed")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    store, update = update_index(args.index, args.catalog, keep=args.keep, force=args.force)
+    print(f"Done in {time.perf_counter() - started:.2f}s: {len(store)} assessments in {update.path}")
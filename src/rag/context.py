@@ -0,0 +1,68 @@
+import sys
+
+import numpy as np
+
+from src.rag.payloads import duration_display
+from src.utils.text import estimate_tokens, truncate_words
+
+CONTEXT_SEPARATOR = "\n---\n"
+
+# Catalog descriptions repeat the structured fields after these markers
+_DESCRIPTION_TAILS = (" Job levels ", " Languages ", " Assessment length ")
+
+
+def compact_description(name, description, max_words):
+    """Description without the scraped name prefix and metadata tail, cut to ``max_words``."""
+    description = description or ""
+    # Scraped descriptions start with "<name> Description "
+    title = (name or "").split(" | ")[0]
+    prefix = f"{title} Description "
+    if title and description.startswith(prefix):
+        description = description[len(prefix):]
+    for tail in _DESCRIPTION_TAILS:
+        cut = description.find(tail)
+        if cut > 0:
+            description = description[:cut]
+    return truncate_words(description, max_words)
+
+
+def context_snippet(meta, description_words):
+    return (
+        f"Name: {meta.get('name', 'N/A')}\n"
+        f"Test Type: {meta.get('test_type', 'N/A')}\n"
+        f"Description: {compact_description(meta.get('name'), meta.get('description', 'N/A'), description_words)}\n"
+        f"Remote Testing: {meta.get('remote_support', 'N/A')}\n"
+        f"Adaptive/IRT: {meta.get('adaptive_support', 'N/A')}\n"
+        f"Duration: {duration_display(meta)}\n"
+    )
+
+
+class ContextBuilder:
+    """Packs precomputed per-assessment snippets into the LLM context within a token budget.
+
+    Snippets and their estimated token counts are built once per index
+    load. ``build`` takes snippets in rank order until the next one would
+    exceed the budget; the top result is always included.
+    """
+
+    def __init__(self, store, max_tokens, description_words):
+        self.max_tokens = max_tokens
+        self.snippets = [context_snippet(store.metadata(row), description_words) for row in range(len(store))]
+        self.tokens = np.array([estimate_tokens(snippet) for snippet in self.snippets], dtype=np.int64)
+        self.separator_tokens = estimate_tokens(CONTEXT_SEPARATOR)
+
+    def nbytes(self):
+        return sum(sys.getsizeof(snippet) for snippet in self.snippets) + self.tokens.nbytes
+
+    def build(self, rows, max_tokens=None):
+        """Return ``(context, rows_used)`` for result ``rows`` in rank order."""
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        used = []
+        total = 0
+        for row in rows:
+            cost = self.tokens[row] + (self.separator_tokens if used else 0)
+            if used and total + cost > budget:
+                break
+            used.append(row)
+            total += cost
+        return CONTEXT_SEPARATOR.join(self.snippets[row] for row in used), used
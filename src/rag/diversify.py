@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class DiversityOptions:
+    """Per-request settings for maximal marginal relevance (MMR) selection.
+
+    ``relevance_weight`` trades relevance (1.0, plain ranking order) against
+    novelty (0.0). ``max_per_type`` caps how many results may share a test
+    type code; ``type_quotas`` overrides the cap per code (e.g. ``{"P": 2}``).
+    A result with several codes counts towards each of them.
+    """
+    relevance_weight: float = 0.7
+    max_per_type: int | None = None
+    type_quotas: dict[str, int] | None = None
+
+    def quota(self, code):
+        for key, value in (self.type_quotas or {}).items():
+            if key.strip().upper() == code:
+                return value
+        return self.max_per_type
+
+    def has_quotas(self):
+        return self.max_per_type is not None or bool(self.type_quotas)
+
+
+def mmr_order(relevance, vectors, k, relevance_weight=0.7, type_bits=None, quotas=None):
+    """Greedy MMR over ``len(relevance)`` candidates; returns the chosen positions.
+
+    ``relevance`` is in [0, 1] and ``vectors`` are L2-normalized, one per
+    candidate. ``type_bits`` is a (candidates x codes) boolean matrix and
+    ``quotas`` the per-code maximum (``-1`` for unlimited); a candidate is
+    only eligible while all of its codes are under quota, so fewer than
+    ``k`` positions come back when the quotas cannot be met.
+    """
+    count = len(relevance)
+    similarity = vectors @ vectors.T
+    # Highest similarity of each candidate to anything already selected
+    redundancy = np.zeros(count, dtype=np.float32)
+    available = np.ones(count, dtype=bool)
+    if type_bits is not None:
+        used = np.zeros(type_bits.shape[1], dtype=np.int64)
+        limited = quotas >= 0
+        # Codes with a zero quota exclude their candidates from the start
+        available &= ~type_bits[:, limited & (quotas <= 0)].any(axis=1)
+
+    chosen = []
+    while len(chosen) < k and available.any():
+        scores = relevance_weight * relevance - (1.0 - relevance_weight) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        chosen.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+        if type_bits is not None:
+            used += type_bits[best]
+            full = limited & (used >= quotas)
+            if full.any():
+                available &= ~type_bits[:, full].any(axis=1)
+    return chosen
+
+
+def diversify(retrieval, vectors, k, options, filter_index=None):
+    """Reorder ``retrieval`` in place by MMR and truncate it to ``k`` documents.
+
+    ``vectors`` are the store's per-assessment vectors; only the candidates'
+    rows are read, so nothing is re-embedded. Relevance is the retrieval's
+    own score, scaled to [0, 1], so MMR works on top of dense, hybrid and
+    reranked rankings alike.
+    """
+    if len(retrieval) <= 1:
+        return retrieval
+    rows = np.asarray(retrieval.rows)
+    candidate_vectors = np.asarray(vectors[rows], dtype=np.float32)
+    norms = np.linalg.norm(candidate_vectors, axis=1, keepdims=True)
+    candidate_vectors = candidate_vectors / np.maximum(norms, 1e-12)
+
+    scores = np.asarray(retrieval.scores, dtype=np.float32)
+    # Scores are in ranking order, so rising scores are distances (legacy L2 stores)
+    if scores[0] < scores[-1]:
+        scores = -scores
+    spread = scores.max() - scores.min()
+    relevance = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+
+    type_bits = quotas = None
+    if options.has_quotas() and filter_index is not None:
+        codes, type_bits = filter_index.type_bits(rows)
+        quotas = np.array([-1 if options.quota(code) is None else options.quota(code) for code in codes])
+
+    order = mmr_order(relevance, candidate_vectors, k, options.relevance_weight, type_bits, quotas)
+    retrieval.reorder(order)
+    return retrieval
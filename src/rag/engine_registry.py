@@ -0,0 +1,203 @@
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from src.rag.rag_engine import AssessmentRecommendationEngine
+from src.vector_store.native_store import NativeIndexStore
+from src.vector_store.versions import resolve_index_path
+from src.config import CATALOGS, CATALOGS_DIR, DEFAULT_CATALOG, CATALOG_CACHE_MAX_ENGINES, CATALOG_CACHE_MAX_MB
+
+
+# Catalog ids become directory names under CATALOGS_DIR
+CATALOG_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class UnknownCatalogError(KeyError):
+    pass
+
+
+class CatalogNotReadyError(RuntimeError):
+    """The catalog's index is being built in the background (or its last build failed)."""
+
+    def __init__(self, catalog_id, error=None):
+        self.catalog_id = catalog_id
+        self.error = error
+        super().__init__(f"Index for catalog '{catalog_id}' is still being built" if error is None
+                         else f"Index build for catalog '{catalog_id}' failed: {error}")
+
+
+class EngineRegistry:
+    """Per-catalog engines loaded on first use and kept in a memory-bounded LRU.
+
+    The default catalog's engine is loaded up front and never evicted; every
+    other engine is created with ``shared=`` that engine, so all catalogs use
+    one embedding model, reranker and LLM client. Eviction only drops the
+    registry's reference: requests holding an evicted engine finish normally.
+
+    Requests only ever load an existing index. A catalog that has no index
+    yet is built in a background thread and ``get()`` raises
+    ``CatalogNotReadyError`` until the build has been published.
+    """
+
+    def __init__(self, result_sink=None, llm=None, catalogs=None, catalogs_dir=CATALOGS_DIR,
+                 default_catalog=DEFAULT_CATALOG, max_engines=CATALOG_CACHE_MAX_ENGINES,
+                 max_bytes=CATALOG_CACHE_MAX_MB * 1024 * 1024):
+        self.catalogs = dict(CATALOGS if catalogs is None else catalogs)
+        self.catalogs_dir = Path(catalogs_dir) if catalogs_dir else None
+        self.default_catalog = default_catalog
+        self.max_engines = max_engines
+        self.max_bytes = max_bytes
+        self.result_sink = result_sink
+        self.loads = 0
+        self.evictions = 0
+
+        self._engines = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        # catalog id -> build thread, and -> (catalog mtime, error) for failed builds
+        self._builds = {}
+        self._build_errors = {}
+
+        index_path, catalog_path = self.resolve(default_catalog)
+        self.default = AssessmentRecommendationEngine(
+            index_path, catalog_path=catalog_path, result_sink=result_sink, llm=llm
+        )
+        self._store(default_catalog, self.default)
+
+    def resolve(self, catalog_id):
+        """Return ``(index_path, catalog_path)`` for ``catalog_id``."""
+        if catalog_id in self.catalogs:
+            entry = self.catalogs[catalog_id]
+            return entry["index_path"], entry.get("catalog_path")
+        if self.catalogs_dir is not None and CATALOG_ID_RE.match(catalog_id or ""):
+            directory = self.catalogs_dir / catalog_id
+            if directory.is_dir():
+                index_path = directory / "faiss_index"
+                catalog_files = sorted(
+                    path for path in directory.glob("catalog.*") if path.suffix in (".json", ".csv", ".xlsx")
+                )
+                # Servable once it has an index or a catalog to build one from
+                if catalog_files or NativeIndexStore.exists(resolve_index_path(index_path)):
+                    return index_path, catalog_files[0] if catalog_files else None
+        raise UnknownCatalogError(catalog_id)
+
+    def cached(self, catalog_id=None):
+        """Return the engine for ``catalog_id`` if it is already loaded, else None."""
+        catalog_id = catalog_id or self.default_catalog
+        with self._lock:
+            engine = self._engines.get(catalog_id)
+            if engine is not None:
+                self._engines.move_to_end(catalog_id)
+            return engine
+
+    def get(self, catalog_id=None):
+        """Return the engine for ``catalog_id`` (default catalog when None), loading it if needed.
+
+        Raises ``CatalogNotReadyError`` (after starting a background build)
+        when the catalog has no index yet.
+        """
+        catalog_id = catalog_id or self.default_catalog
+        engine = self.cached(catalog_id)
+        if engine is not None:
+            return engine
+        with self._lock:
+            load_lock = self._load_locks.setdefault(catalog_id, threading.Lock())
+
+        # Concurrent requests for the same catalog wait for one load
+        with load_lock:
+            with self._lock:
+                engine = self._engines.get(catalog_id)
+            if engine is not None:
+                return engine
+            index_path, catalog_path = self.resolve(catalog_id)
+            if not NativeIndexStore.exists(resolve_index_path(index_path)):
+                self._start_build(catalog_id, index_path, catalog_path)
+            # No catalog_path: a missing index is never built on this (request) thread
+            engine = AssessmentRecommendationEngine(
+                index_path, catalog_path=None, result_sink=self.result_sink, shared=self.default
+            )
+            self.loads += 1
+            self._store(catalog_id, engine)
+            return engine
+
+    def replace(self, catalog_id, engine):
+        """Swap in a reloaded engine for ``catalog_id``."""
+        if catalog_id == self.default_catalog:
+            self.default = engine
+        self._store(catalog_id, engine)
+
+    def _start_build(self, catalog_id, index_path, catalog_path):
+        """Build ``catalog_id``'s first index off the request path; always raises CatalogNotReadyError."""
+        if catalog_path is None:
+            raise CatalogNotReadyError(catalog_id, "no index and no catalog to build it from")
+        mtime = Path(catalog_path).stat().st_mtime
+        with self._lock:
+            failed = self._build_errors.get(catalog_id)
+            # A failed build is only retried once the catalog file has changed
+            if failed is not None and failed[0] == mtime:
+                raise CatalogNotReadyError(catalog_id, failed[1])
+            if catalog_id not in self._builds:
+                thread = threading.Thread(
+                    target=self._build, args=(catalog_id, index_path, catalog_path, mtime),
+                    name=f"catalog-build-{catalog_id}", daemon=True
+                )
+                self._builds[catalog_id] = thread
+                thread.start()
+        raise CatalogNotReadyError(catalog_id)
+
+    def _build(self, catalog_id, index_path, catalog_path, mtime):
+        from src.ingestion.update_index import update_index
+
+        try:
+            print(f"Building index for catalog '{catalog_id}' from {catalog_path}...")
+            update_index(index_path, catalog_path, model=self.default.embeddings.model)
+            with self._lock:
+                self._build_errors.pop(catalog_id, None)
+            print(f"Built index for catalog '{catalog_id}'")
+        except Exception as e:
+            with self._lock:
+                self._build_errors[catalog_id] = (mtime, str(e))
+            print(f"Index build for catalog '{catalog_id}' failed: {e}")
+        finally:
+            with self._lock:
+                self._builds.pop(catalog_id, None)
+
+    def loaded(self):
+        with self._lock:
+            return list(self._engines.items())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "default": self.default_catalog,
+                "loaded": {
+                    catalog_id: {"index_version": engine.index_version, "bytes": self._sizes[catalog_id]}
+                    for catalog_id, engine in self._engines.items()
+                },
+                "building": sorted(self._builds),
+                "build_errors": {catalog_id: error for catalog_id, (_, error) in self._build_errors.items()},
+                "bytes": sum(self._sizes.values()),
+                "max_bytes": self.max_bytes,
+                "max_engines": self.max_engines,
+                "loads": self.loads,
+                "evictions": self.evictions
+            }
+
+    def _store(self, catalog_id, engine):
+        size = engine.memory_bytes()
+        with self._lock:
+            self._engines[catalog_id] = engine
+            self._engines.move_to_end(catalog_id)
+            self._sizes[catalog_id] = size
+            # Evict least recently used catalogs, never the default or the one just added
+            for candidate in list(self._engines):
+                if len(self._engines) <= self.max_engines and sum(self._sizes.values()) <= self.max_bytes:
+                    break
+                if candidate in (self.default_catalog, catalog_id):
+                    continue
+                del self._engines[candidate]
+                del self._sizes[candidate]
+                self.evictions += 1
+                print(f"Evicted catalog '{candidate}' from the engine cache")
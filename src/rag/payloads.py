@@ -0,0 +1,136 @@
+import sys
+import json
+
+from src.utils.fast_json import dumps, join_object
+from src.vector_store.native_store import ID_FIELD
+
+# Fields of an assessment in API responses, in response order
+PAYLOAD_FIELDS = (
+    "url", "name", "description", "test_type", "duration", "duration_display",
+    "remote_support", "adaptive_support"
+)
+# Returned when a request does not ask for specific fields
+DEFAULT_FIELDS = (
+    "url", "name", "description", "test_type", "duration", "remote_support", "adaptive_support"
+)
+
+
+def split_test_types(value):
+    return [code.strip() for code in str(value or "").split(",") if code.strip()]
+
+
+def duration_display(meta):
+    # Formatted once at ingestion; older indexes only carry the raw text
+    if meta.get("duration_display"):
+        return meta["duration_display"]
+    duration = meta.get('duration', 'N/A')
+    if duration and duration != 'N/A' and 'minute' not in str(duration).lower():
+        return f"{duration} minutes"
+    return duration
+
+
+def assessment_payload(meta):
+    return {
+        "url": meta.get("url", ""),
+        "name": meta.get("name", ""),
+        "description": meta.get("description", ""),
+        "test_type": split_test_types(meta.get("test_type", "")),
+        "duration": meta.get("duration", 0),
+        "duration_display": duration_display(meta),
+        "remote_support": meta.get("remote_support", "Yes"),
+        "adaptive_support": meta.get("adaptive_support", "No")
+    }
+
+
+def fallback_entry(meta):
+    """Text block and result-sink record for one assessment in the no-LLM response."""
+    display = duration_display(meta)
+    record = {
+        "name": meta.get('name', 'N/A'),
+        "url": meta.get('url', 'N/A'),
+        "description": meta.get('description', 'N/A'),
+        "test_type": split_test_types(meta.get('test_type', '')),
+        "remote_support": meta.get('remote_support', 'N/A'),
+        "adaptive_support": meta.get('adaptive_support', 'N/A'),
+        "duration": display
+    }
+    text = (
+        f"{meta.get('name', 'Unknown Title')}\n"
+        f"Test Type: {meta.get('test_type', 'N/A')}\n\n"
+        f"Description:\n{meta.get('description', 'No description available.')}\n\n"
+        f"Remote Testing: {meta.get('remote_support', 'N/A')}\n"
+        f"Adaptive/IRT: {meta.get('adaptive_support', 'N/A')}\n"
+        f"Duration: {display}\n\n"
+        "🧩 Backend JSON (API response example)\n"
+        f"{json.dumps(record, indent=2)}\n\n"
+    )
+    return text, record
+
+
+class AssessmentPayloads:
+    """Response payloads for every assessment in a store, built once at index load.
+
+    Each field of each row is pre-serialized as a ``"key":value`` JSON
+    fragment, so a response (or any projection of its fields) is assembled
+    by joining bytes instead of building and encoding dicts per request.
+    Rows are looked up by position or by document id.
+    """
+
+    def __init__(self, store):
+        self.rows_by_id = {doc_id: row for row, doc_id in enumerate(store.columns[ID_FIELD].tolist())}
+        self.payloads = []
+        self.fallbacks = []
+        self.fragments = {field: [] for field in PAYLOAD_FIELDS}
+        for row in range(len(store)):
+            meta = store.metadata(row)
+            payload = assessment_payload(meta)
+            self.payloads.append(payload)
+            self.fallbacks.append(fallback_entry(meta))
+            for field in PAYLOAD_FIELDS:
+                self.fragments[field].append(dumps(field) + b":" + dumps(payload[field]))
+        # Full default payloads, the common case, are joined once here
+        self._default_json = [self._join(row, DEFAULT_FIELDS) for row in range(len(store))]
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def nbytes(self):
+        """Estimated memory held by the payloads, their JSON and the fallback entries."""
+        size = sum(sys.getsizeof(fragment) for fragments in self.fragments.values() for fragment in fragments)
+        size += sum(sys.getsizeof(data) for data in self._default_json)
+        for payload, (text, record) in zip(self.payloads, self.fallbacks):
+            size += sys.getsizeof(payload) + sum(sys.getsizeof(value) for value in payload.values())
+            size += sys.getsizeof(text) + sys.getsizeof(record)
+        return size
+
+    def payload(self, row):
+        return self.payloads[row]
+
+    def payload_for(self, doc_id):
+        return self.payloads[self.rows_by_id[doc_id]]
+
+    def fallback(self, row):
+        return self.fallbacks[row]
+
+    def json(self, row, fields=None):
+        """JSON bytes of one assessment, limited to ``fields`` when given."""
+        if fields is None:
+            return self._default_json[row]
+        return self._join(row, fields)
+
+    def json_many(self, rows, fields=None):
+        return [self.json(row, fields) for row in rows]
+
+    def _join(self, row, fields):
+        return join_object([self.fragments[field][row] for field in fields])
+
+
+def parse_fields(value):
+    """Parse a ``fields=name,url`` projection; None for the default fields."""
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(",") if field.strip()))
+    unknown = [field for field in fields if field not in PAYLOAD_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}, expected any of {list(PAYLOAD_FIELDS)}")
+    return fields or None
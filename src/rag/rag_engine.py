@@ -1,8 +1,10 @@
 import sys
 import os
-import json
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from pathlib import Path
-import pandas as pd
+import numpy as np
 from dotenv import load_dotenv
 
 # Add project root to sys.path if running directly
@@ -10,125 +12,52 @@ project_root = Path(__file__).resolve().parents[2]
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.embeddings import Embeddings
 
 from src.embeddings.embedder import load_embedder
-from src.ingestion.load_catalog import load_catalog
-from src.config import EMBEDDING_MODEL, GEMINI_MODEL, CATALOG_PATH, TOP_K
+from src.embeddings.cache import QueryEmbeddingCache
+from src.embeddings.batcher import BatchingEncoder
+from src.rag.retrieval import RetrievalResult
+from src.vector_store.native_store import NativeIndexStore
+from src.vector_store.versions import resolve_index_path
+from src.vector_store.filters import MetadataFilterIndex
+from src.vector_store.bm25 import BM25Index, BM25_FILE, reciprocal_rank_fusion
+from src.rag.circuit_breaker import CircuitBreaker
+from src.rag.response_cache import ResponseCache
+from src.rag.reranker import CrossEncoderReranker
+from src.rag.diversify import DiversityOptions, diversify
+from src.rag.payloads import AssessmentPayloads
+from src.rag.context import ContextBuilder
+from src.utils.result_sink import ResultSink
+from src.utils.text import clean_text, split_segments
+from src.utils.metrics import timed, record_stage, LLM_CALLS, LLM_FALLBACKS
+from src.config import (
+    EMBEDDING_MODEL, GEMINI_MODEL, CATALOG_PATH, TOP_K,
+    EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH,
+    ENCODE_BATCH_WINDOW_MS, ENCODE_MAX_BATCH,
+    LLM_TIMEOUT_S, LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_S, LLM_MAX_WORKERS,
+    LLM_CONTEXT_TOKENS, CONTEXT_DESCRIPTION_WORDS,
+    RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_S, RESPONSE_CACHE_SIMILARITY,
+    SEARCH_MODE, HYBRID_CANDIDATES, HYBRID_DENSE_WEIGHT, HYBRID_LEXICAL_WEIGHT, RRF_K,
+    LONG_QUERY_WORDS, MAX_QUERY_SEGMENTS,
+    CHUNK_POOLING, CHUNK_CANDIDATE_FACTOR,
+    RERANK_ENABLED, RERANK_MODEL, RERANK_TOP_N, RERANK_BUDGET_MS, RERANK_BATCH_SIZE, RERANK_CACHE_SIZE,
+    DIVERSITY_ENABLED, DIVERSITY_LAMBDA, DIVERSITY_CANDIDATES, DIVERSITY_QUOTA_CANDIDATES,
+    DIVERSITY_MAX_PER_TYPE,
+    RESULT_SINK_PATH, RESULT_SINK_QUEUE_SIZE, RESULT_SINK_BATCH_SIZE
+)
 
 load_dotenv()
 
+# Bump whenever PROMPT_TEMPLATE or the context format changes so cached
+# explanations are not reused
+PROMPT_VERSION = "2"
 
-class SentenceTransformerEmbeddings(Embeddings):
-    def __init__(self, model_name):
-        self.model = load_embedder(model_name)
-
-    def embed_documents(self, texts):
-        return self.model.encode(texts).tolist()
-
-    def embed_query(self, text):
-        return self.model.encode([text])[0].tolist()
-    
-    def __call__(self, text):
-        return self.embed_query(text)
-
-
-class AssessmentRecommendationEngine:
-    def __init__(self, index_path="data/faiss_index"):
-        self.embeddings = SentenceTransformerEmbeddings(EMBEDDING_MODEL)
-        
-        # Load or build the FAISS index
-        if os.path.exists(index_path):
-            try:
-                self.vector_store = FAISS.load_local(
-                    index_path, 
-                    self.embeddings,
-                    allow_dangerous_deserialization=True
-                )
-                print(f"Loaded FAISS index from {index_path}")
-            except Exception as e:
-                print(f"Error loading FAISS index: {e}")
-                raise
-        else:
-            print(f"Index not found at {index_path}. Building new index...")
-            df = load_catalog(CATALOG_PATH)
-            texts = df["combined_text"].tolist()
-            
-            # Convert DataFrame rows to metadata dicts
-            # Handle NaN values in metadata which FAISS/LangChain might dislike
-            df_meta = df.fillna("")
-            metadatas = df_meta.to_dict(orient="records")
-            
-            self.vector_store = FAISS.from_texts(
-                texts, 
-                self.embeddings, 
-                metadatas=metadatas
-            )
-            self.vector_store.save_local(index_path)
-            print(f"Created and saved FAISS index to {index_path}")
-
-        # Initialize LLM (Gemini)
-        api_key = os.getenv("GEMINI_API_KEY")
-        if api_key:
-            self.llm = ChatGoogleGenerativeAI(
-                model=GEMINI_MODEL,
-                google_api_key=api_key,
-                temperature=0.3
-            )
-        else:
-            print("Warning: GEMINI_API_KEY not found. LLM features will be disabled.")
-            self.llm = None
-
-    def search(self, query, k=3):
-        docs = self.vector_store.similarity_search(query, k=k)
-        return docs
+NO_RESULTS_MESSAGE = "I couldn't find any relevant assessments for your request."
 
-    def _save_to_files(self, data):
-        try:
-            output_dir = Path("outputs")
-            output_dir.mkdir(exist_ok=True)
-            
-            # Save JSON
-            with open(output_dir / "output.json", "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
-                
-            # Save CSV
-            df = pd.DataFrame(data)
-            df.to_csv(output_dir / "output.csv", index=False)
-            print(f"Saved results to {output_dir}/output.json and {output_dir}/output.csv")
-        except Exception as e:
-            print(f"Error saving outputs: {e}")
-
-    def recommend(self, query):
-        # 1. Retrieve relevant documents
-        retrieved_docs = self.search(query, k=TOP_K)
-
-        if not retrieved_docs:
-            return "I couldn't find any relevant assessments for your request."
-
-        # Construct context from metadata to ensure all fields are available to the LLM
-        context_entries = []
-        for doc in retrieved_docs:
-            meta = doc.metadata
-            entry = (
-                f"Name: {meta.get('name', 'N/A')}\n"
-                f"Test Type: {meta.get('test_type', 'N/A')}\n"
-                f"Description: {meta.get('description', 'N/A')}\n"
-                f"Remote Testing: {meta.get('remote_support', 'N/A')}\n"
-                f"Adaptive/IRT: {meta.get('adaptive_support', 'N/A')}\n"
-                f"Duration: {meta.get('duration', 'N/A')}\n"
-            )
-            context_entries.append(entry)
-        
-        context_text = "\n---\n".join(context_entries)
-
-        # 2. If LLM is available, generate a response
-        if self.llm:
-            prompt_template = """
+PROMPT_TEMPLATE = """
             You are an expert consultant for SHL, a global leader in talent acquisition and management.
             Your goal is to recommend the best assessments based on the user's needs.
 
@@ -157,73 +86,652 @@ class AssessmentRecommendationEngine:
             If the answer is not in the context, say you don't have enough information.
             """
 
-            prompt = PromptTemplate(
-                template=prompt_template,
-                input_variables=["context", "query"]
+# Parsed once; each engine binds it to its LLM in _build_chain()
+PROMPT = PromptTemplate(template=PROMPT_TEMPLATE, input_variables=["context", "query"])
+
+
+class StreamInterruptedError(RuntimeError):
+    """The LLM stream failed after part of the explanation was sent.
+
+    ``fallback`` is the raw-results text to show in place of the truncated
+    explanation.
+    """
+
+    def __init__(self, cause, fallback):
+        super().__init__(f"LLM stream failed mid-response: {cause!r}")
+        self.fallback = fallback
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    def __init__(self, model_name, cache=None, batch_window_ms=0, max_batch=32):
+        self.model_name = model_name
+        self.model = load_embedder(model_name)
+        self.cache = cache
+        # Coalesces concurrent query encodes from threadpool workers
+        self.batcher = BatchingEncoder(self.model, batch_window_ms, max_batch) if batch_window_ms > 0 else None
+
+    def embed_documents(self, texts):
+        return self.model.encode(texts).tolist()
+
+    def encode_query(self, text):
+        # Queries are normalized the same way as the indexed combined_text,
+        # which also makes trivially different spellings share a cache entry
+        with timed("normalize"):
+            normalized = clean_text(text)
+        if self.cache is None:
+            with timed("embed"):
+                return self._encode_one(normalized)
+
+        key = (self.model_name, normalized)
+        vector = self.cache.get(key)
+        if vector is None:
+            with timed("embed"):
+                vector = self._encode_one(normalized)
+            self.cache.put(key, vector)
+        return vector
+
+    def encode_queries(self, texts):
+        """Encode many queries with a single ``model.encode`` call for the cache misses.
+
+        A single miss goes through the batcher when one is configured, so it
+        is coalesced with other requests' encodes; several misses are already
+        a batch and skip its window and size cap.
+        """
+        with timed("normalize"):
+            normalized = [clean_text(text) for text in texts]
+        vectors = [None] * len(normalized)
+        misses = {}
+        for i, text in enumerate(normalized):
+            cached = self.cache.get((self.model_name, text)) if self.cache is not None else None
+            if cached is None:
+                misses.setdefault(text, []).append(i)
+            else:
+                vectors[i] = cached
+
+        if misses:
+            with timed("embed"):
+                if len(misses) == 1:
+                    encoded = [self._encode_one(next(iter(misses)))]
+                else:
+                    encoded = self.model.encode(list(misses)).astype("float32")
+            for text, vector in zip(misses, encoded):
+                if self.cache is not None:
+                    self.cache.put((self.model_name, text), vector)
+                for i in misses[text]:
+                    vectors[i] = vector
+
+        return np.stack(vectors) if vectors else np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype="float32")
+
+    def _encode_one(self, text):
+        if self.batcher is not None:
+            return self.batcher.encode(text)
+        return self.model.encode([text])[0].astype("float32")
+
+    def embed_query(self, text):
+        return self.encode_query(text).tolist()
+    
+    def __call__(self, text):
+        return self.embed_query(text)
+
+
+def _load_store(index_path):
+    # A versioned index opens the version CURRENT points at
+    path = resolve_index_path(index_path)
+    return NativeIndexStore(path) if NativeIndexStore.exists(path) else None
+
+
+def _load_bm25(store):
+    bm25_path = store.path / BM25_FILE
+    if bm25_path.exists():
+        return BM25Index.load(bm25_path)
+    # Published versions are read-only; update_index writes the file with the next version
+    bm25 = BM25Index.build(store.columns["combined_text"].tolist())
+    print(f"No {BM25_FILE} in {store.path}; built BM25 over {bm25.count} assessments in memory")
+    return bm25
+
+
+class AssessmentRecommendationEngine:
+    def __init__(self, index_path="data/faiss_index", result_sink=None, llm=None, shared=None,
+                 catalog_path=CATALOG_PATH):
+        # Optional ResultSink; when None, fallback results are not persisted
+        self.result_sink = result_sink
+        self.index_path = index_path
+        # Source for the first build when index_path has no index yet
+        self.catalog_path = catalog_path
+
+        started = time.perf_counter()
+        self.reranker = None
+        if shared is not None:
+            # Reload (see reload()): only the index is new, models and caches stay warm
+            self.embeddings = shared.embeddings
+            self.reranker = shared.reranker
+            self.store = _load_store(index_path)
+        else:
+            self._load_models_and_store(index_path)
+
+        if self.store is not None:
+            print(f"Loaded index with {len(self.store)} assessments from {self.store.path}")
+        else:
+            # Building needs the embedding model, so it cannot overlap with loading it
+            from src.ingestion.update_index import update_index
+
+            if catalog_path is None:
+                raise FileNotFoundError(f"No index at {index_path} and no catalog to build it from")
+            print(f"Index not found at {index_path}. Building new index...")
+            self.store, _ = update_index(index_path, catalog_path, model=self.embeddings.model)
+            print(f"Created and saved index to {self.store.path}")
+        # None for indexes written before versioning
+        self.index_version = self.store.manifest.get("version")
+        # Bitsets for structured filters, applied as a pre-filter inside FAISS
+        self.filter_index = MetadataFilterIndex(self.store)
+        # Lexical index for hybrid search, stored next to the vectors by update_index
+        self.bm25 = _load_bm25(self.store)
+        # Response payloads and their JSON, so requests only join precomputed bytes
+        self.payloads = AssessmentPayloads(self.store)
+        # Compact per-assessment LLM context snippets, packed per request within a token budget
+        self.context_builder = ContextBuilder(self.store, LLM_CONTEXT_TOKENS, CONTEXT_DESCRIPTION_WORDS)
+        self.search_mode = SEARCH_MODE
+        print(f"Engine loaded in {time.perf_counter() - started:.2f}s")
+
+        if shared is not None:
+            # One LLM client, breaker and explanation cache across index versions;
+            # cached explanations are keyed on document fingerprints
+            self.llm = shared.llm
+            self.chain = shared.chain
+            self.llm_timeout = shared.llm_timeout
+            self.breaker = shared.breaker
+            self._llm_executor = shared._llm_executor
+            self.response_cache = shared.response_cache
+        else:
+            self._init_llm(llm)
+
+    def _load_models_and_store(self, index_path):
+        # The embedding model, the index and the reranker are independent, so load them concurrently
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="engine-load") as loader:
+            embeddings_future = loader.submit(
+                SentenceTransformerEmbeddings,
+                EMBEDDING_MODEL,
+                cache=QueryEmbeddingCache(EMBEDDING_CACHE_SIZE, path=EMBEDDING_CACHE_PATH),
+                batch_window_ms=ENCODE_BATCH_WINDOW_MS,
+                max_batch=ENCODE_MAX_BATCH
             )
+            store_future = loader.submit(_load_store, index_path)
+            if RERANK_ENABLED:
+                reranker_future = loader.submit(
+                    CrossEncoderReranker,
+                    RERANK_MODEL,
+                    top_n=RERANK_TOP_N,
+                    budget_ms=RERANK_BUDGET_MS,
+                    batch_size=RERANK_BATCH_SIZE,
+                    cache_size=RERANK_CACHE_SIZE
+                )
+                self.reranker = reranker_future.result()
+            self.embeddings = embeddings_future.result()
+            self.store = store_future.result()
+
+    def _init_llm(self, llm):
+        # Initialize LLM (Gemini); an explicit chat model (e.g. a local fake) wins
+        api_key = os.getenv("GEMINI_API_KEY")
+        if llm is not None:
+            self.llm = llm
+        elif api_key:
+            # Imported only when a key is configured; the client is slow to import
+            from langchain_google_genai import ChatGoogleGenerativeAI
 
-            # Using LCEL (LangChain Expression Language)
+            self.llm = ChatGoogleGenerativeAI(
+                model=GEMINI_MODEL,
+                google_api_key=api_key,
+                temperature=0.3
+            )
+        else:
+            print("Warning: GEMINI_API_KEY not found. LLM features will be disabled.")
+            self.llm = None
+        # Built once per engine; the LLM client is reused across requests
+        self.chain = self._build_chain()
+
+        # Per-call deadline plus a breaker that skips a failing LLM entirely
+        self.llm_timeout = LLM_TIMEOUT_S
+        self.breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_S)
+        self._llm_executor = ThreadPoolExecutor(max_workers=LLM_MAX_WORKERS, thread_name_prefix="llm")
+
+        # Explanations depend only on the query, retrieved docs, prompt and model
+        self.response_cache = ResponseCache(
+            RESPONSE_CACHE_SIZE,
+            ttl=RESPONSE_CACHE_TTL_S,
+            similarity_threshold=RESPONSE_CACHE_SIMILARITY
+        )
+
+    def reload(self):
+        """Return a new engine on the index version ``CURRENT`` now points at.
+
+        The new engine shares this one's embedding model (and query cache),
+        reranker, LLM client and explanation cache, so a reload costs only
+        the index load. This engine stays usable for in-flight requests;
+        callers swap their reference once the new one is ready.
+        """
+        return AssessmentRecommendationEngine(
+            self.index_path, result_sink=self.result_sink, shared=self, catalog_path=self.catalog_path
+        )
+
+    def index_bytes(self):
+        """On-disk size of the loaded index version's files."""
+        return sum(path.stat().st_size for path in self.store.path.rglob("*") if path.is_file())
+
+    def memory_bytes(self):
+        """Estimated memory of everything this engine holds per index.
+
+        The index files count in full (vectors and FAISS data are mapped or
+        loaded), plus the structures built from them at load: payloads,
+        context snippets, BM25 postings and filter bitsets. Shared models and
+        caches are not included.
+        """
+        return (
+            self.index_bytes() + self.payloads.nbytes() + self.context_builder.nbytes()
+            + self.bm25.nbytes() + self.filter_index.nbytes()
+        )
+
+    def retrieve(self, query, k=TOP_K, filters=None, mode=None, rerank=None, diversity=None):
+        """Retrieve the top ``k`` documents for ``query``.
+
+        ``filters`` (``SearchFilters``) restricts the candidates; ``mode`` is
+        ``"dense"`` or ``"hybrid"`` (dense + BM25 fused with reciprocal rank
+        fusion) and defaults to ``SEARCH_MODE``. ``rerank`` toggles the
+        cross-encoder stage and defaults to on when a reranker is loaded.
+        ``diversity`` (``DiversityOptions``, or False to disable) re-selects
+        the final ``k`` by MMR; None follows ``DIVERSITY_ENABLED``.
+        """
+        return self.retrieve_many(
+            [query], k=k, filters=filters, mode=mode, rerank=rerank, diversity=diversity
+        )[0]
+
+    def retrieve_many(self, queries, k=TOP_K, filters=None, mode=None, rerank=None, diversity=None):
+        """Retrieve for several queries with one batched encode and one FAISS search."""
+        if not queries:
+            return []
+        rerank = self.reranker is not None if rerank is None else rerank and self.reranker is not None
+        if diversity is None and DIVERSITY_ENABLED:
+            diversity = DiversityOptions(DIVERSITY_LAMBDA, max_per_type=DIVERSITY_MAX_PER_TYPE)
+        # MMR chooses the final k from a wider candidate pool
+        pool = k
+        if diversity:
+            pool = max(k, DIVERSITY_QUOTA_CANDIDATES if diversity.has_quotas() else DIVERSITY_CANDIDATES)
+        results = self._retrieve_candidates(queries, max(pool, RERANK_TOP_N) if rerank else pool, filters, mode)
+        if rerank:
+            # One cross-encoder batch for all queries
+            with timed("rerank"):
+                self.reranker.rerank_many(results, pool)
+        if diversity:
+            with timed("diversify"):
+                for result in results:
+                    diversify(result, self.store.vectors, k, diversity, self.filter_index)
+        return results
+
+    def _retrieve_candidates(self, queries, k, filters, mode):
+        # Long queries are segmented individually; the rest share one encode + search
+        results = [None] * len(queries)
+        short = []
+        for i, query in enumerate(queries):
+            segments = self._long_query_segments(query)
+            if segments:
+                results[i] = self._retrieve_segmented(query, segments, k, filters, mode)
+            else:
+                short.append(i)
+
+        if short:
+            short_queries = [queries[i] for i in short]
+            query_vectors = self.embeddings.encode_queries(short_queries)
+            with timed("search"):
+                searched = self._search_vectors(short_queries, query_vectors, k, filters, mode)
+            for i, result in zip(short, searched):
+                results[i] = result
+        return results
+
+    def _long_query_segments(self, query):
+        if len(query.split()) <= LONG_QUERY_WORDS:
+            return None
+        segments = split_segments(query, max_segments=MAX_QUERY_SEGMENTS)
+        return segments if len(segments) > 1 else None
+
+    def _retrieve_segmented(self, query, segments, k, filters=None, mode=None):
+        """Search each segment of a long query and merge the rankings with RRF.
+
+        All segments are encoded in one batched call and searched with one
+        multi-query FAISS search; in hybrid mode BM25 over the whole query is
+        fused in as one more ranking.
+        """
+        mode = mode or self.search_mode
+        row_mask = self.filter_index.mask(filters)
+        segment_vectors = self.embeddings.encode_queries(segments)
+        query_vector = segment_vectors.mean(axis=0)
+        if row_mask is not None and not row_mask.any():
+            return RetrievalResult(query=query, query_vector=query_vector)
+
+        candidates = max(k, HYBRID_CANDIDATES)
+        with timed("search"):
+            rankings = [rows for rows, _ in self._dense_rank(segment_vectors, candidates, row_mask)]
+            weights = [1.0] * len(rankings)
+            if mode == "hybrid":
+                lexical_rows, _ = self.bm25.top_k(query, candidates, row_mask=row_mask)
+                # Give the lexical ranking the same total weight as all dense segments
+                weights = [HYBRID_DENSE_WEIGHT / len(rankings)] * len(rankings) + [HYBRID_LEXICAL_WEIGHT]
+                rankings.append(lexical_rows)
+            rows, scores = reciprocal_rank_fusion(rankings, weights, len(self.store), k, rrf_k=RRF_K)
+
+        return RetrievalResult(
+            query=query,
+            query_vector=query_vector,
+            rows=rows.tolist(),
+            store=self.store,
+            fingerprints=[self.store.fingerprint(i) for i in rows],
+            scores=scores.tolist()
+        )
+
+    def _search_vectors(self, queries, query_vectors, k, filters=None, mode=None):
+        mode = mode or self.search_mode
+        row_mask = self.filter_index.mask(filters)
+        if row_mask is not None and not row_mask.any():
+            return [RetrievalResult(query=query, query_vector=vector) for query, vector in zip(queries, query_vectors)]
+
+        if mode == "hybrid":
+            ranked = self._hybrid_rank(queries, query_vectors, k, row_mask)
+        elif mode == "dense":
+            ranked = self._dense_rank(query_vectors, k, row_mask)
+        else:
+            raise ValueError(f"Unknown search mode '{mode}'")
+
+        results = []
+        for query, query_vector, (rows, scores) in zip(queries, query_vectors, ranked):
+            results.append(RetrievalResult(
+                query=query,
+                query_vector=query_vector,
+                rows=rows.tolist(),
+                store=self.store,
+                fingerprints=[self.store.fingerprint(i) for i in rows],
+                scores=scores.tolist()
+            ))
+        return results
+
+    def _dense_rank(self, query_vectors, k, row_mask):
+        if self.store.passage_count:
+            return [self._pooled_rank(vector, k, row_mask) for vector in query_vectors]
+        scores, indices = self.store.search(query_vectors, k, row_mask=row_mask)
+        # FAISS pads with -1 when fewer than k vectors exist
+        return [(row_indices[row_indices != -1], row_scores[row_indices != -1]) for row_scores, row_indices in zip(scores, indices)]
+
+    def _pooled_rank(self, query_vector, k, row_mask):
+        """Rank assessments by pooling the similarities of their best-matching passages."""
+        available = int(row_mask.sum()) if row_mask is not None else len(self.store)
+        fetch = min(self.store.passage_count, k * CHUNK_CANDIDATE_FACTOR)
+        while True:
+            scores, indices = self.store.search_passages(query_vector.reshape(1, -1), fetch, row_mask=row_mask)
+            hits = indices[0] != -1
+            rows = np.asarray(self.store.passage_rows)[indices[0][hits]]
+            similarities = self.store.similarity(scores[0][hits])
+            # Widen the passage search until k distinct assessments are covered
+            if len(np.unique(rows)) >= min(k, available) or fetch >= self.store.passage_count:
+                break
+            fetch = min(self.store.passage_count, fetch * 2)
+
+        if CHUNK_POOLING == "sum":
+            pooled = np.bincount(rows, weights=similarities, minlength=len(self.store))
+        else:
+            pooled = np.zeros(len(self.store), dtype=np.float32)
+            np.maximum.at(pooled, rows, similarities)
+        candidates = np.unique(rows)
+        order = np.argsort(-pooled[candidates], kind="stable")[:k]
+        return candidates[order], pooled[candidates[order]].astype(np.float32)
+
+    def _hybrid_rank(self, queries, query_vectors, k, row_mask):
+        candidates = max(k, HYBRID_CANDIDATES)
+        dense = self._dense_rank(query_vectors, candidates, row_mask)
+        ranked = []
+        for query, (dense_rows, _) in zip(queries, dense):
+            lexical_rows, _ = self.bm25.top_k(query, candidates, row_mask=row_mask)
+            ranked.append(reciprocal_rank_fusion(
+                [dense_rows, lexical_rows],
+                [HYBRID_DENSE_WEIGHT, HYBRID_LEXICAL_WEIGHT],
+                len(self.store),
+                k,
+                rrf_k=RRF_K
+            ))
+        return ranked
+
+    def warmup(self, query="software engineer"):
+        """Run one encode + search so the first real request pays no lazy initialization."""
+        started = time.perf_counter()
+        self.retrieve(query, k=TOP_K)
+        print(f"Engine warm-up finished in {time.perf_counter() - started:.2f}s")
+
+    def rerank_status(self):
+        return {"enabled": False} if self.reranker is None else {"enabled": True, **self.reranker.stats()}
+
+    def llm_status(self):
+        return {
+            "enabled": self.llm is not None,
+            "timeout_seconds": self.llm_timeout,
+            "circuit": self.breaker.snapshot()
+        }
+
+    def close(self):
+        self._llm_executor.shutdown(wait=False, cancel_futures=True)
+        # Persist warm query embeddings (no-op unless EMBEDDING_CACHE_PATH is set)
+        if self.embeddings.cache is not None:
+            self.embeddings.cache.save()
+
+    def search(self, query, k=3, **retrieve_options):
+        return self.retrieve(query, k=k, **retrieve_options).docs
+
+    def recommend(self, query, retrieval=None, **retrieve_options):
+        """Return ``(explanation, retrieval)`` for ``query``.
+
+        Pass a ``RetrievalResult`` from ``retrieve()`` to reuse an existing
+        search; otherwise the top ``TOP_K`` documents are retrieved here,
+        with ``retrieve_options`` (``filters``, ``mode``, ``rerank``,
+        ``diversity``) passed through.
+        """
+        # 1. Retrieve relevant documents (once per request)
+        if retrieval is None:
+            retrieval = self.retrieve(query, k=TOP_K, **retrieve_options)
+
+        if len(retrieval) == 0:
+            return NO_RESULTS_MESSAGE, retrieval
+
+        # 2. Reuse a cached explanation, or generate one within the deadline
+        response = self._cached_response(query, retrieval)
+        if response is not None:
+            return response, retrieval
+
+        response = self._invoke_llm(query, retrieval)
+        if response is not None:
+            self._cache_response(query, retrieval, response)
+            return response, retrieval
+
+        # 3. Fallback (or if LLM failed): Return raw search results formatted nicely
+        return self._fallback_response(query, retrieval), retrieval
+
+    async def arecommend(self, query, retrieval=None, **retrieve_options):
+        """Async variant of ``recommend()`` that awaits the LLM without holding a thread."""
+        if retrieval is None:
+            retrieval = await asyncio.to_thread(self.retrieve, query, TOP_K, **retrieve_options)
+
+        if len(retrieval) == 0:
+            return NO_RESULTS_MESSAGE, retrieval
+
+        response = self._cached_response(query, retrieval)
+        if response is not None:
+            return response, retrieval
+
+        response = await self._ainvoke_llm(query, retrieval)
+        if response is not None:
+            self._cache_response(query, retrieval, response)
+            return response, retrieval
+
+        return self._fallback_response(query, retrieval), retrieval
+
+    async def astream_explanation(self, query, retrieval):
+        """Yield the explanation for an existing retrieval as text chunks.
+
+        Falls back to the raw results text if the LLM is unavailable or fails
+        before producing any output. A failure after some chunks were yielded
+        raises ``StreamInterruptedError`` carrying that fallback text.
+        """
+        if len(retrieval) == 0:
+            yield NO_RESULTS_MESSAGE
+            return
+
+        cached = self._cached_response(query, retrieval)
+        if cached is not None:
+            yield cached
+            return
+
+        if self.llm and self._allow_llm():
+            chunks = []
+            inputs = self._chain_inputs(query, retrieval)
+            started = time.perf_counter()
             try:
-                chain = prompt | self.llm | StrOutputParser()
-                response = chain.invoke({"context": context_text, "query": query})
-                return response
+                async with asyncio.timeout(self.llm_timeout):
+                    async for chunk in self.chain.astream(inputs):
+                        chunks.append(chunk)
+                        yield chunk
+                self.breaker.record_success()
+                LLM_CALLS.labels("success").inc()
+                self._cache_response(query, retrieval, "".join(chunks))
+                return
             except Exception as e:
-                print(f"LLM generation failed (likely rate limit): {e}")
+                # TimeoutError lands here too once the deadline expires
+                self.breaker.record_failure()
+                LLM_CALLS.labels("timeout" if isinstance(e, TimeoutError) else "error").inc()
+                print(f"LLM streaming failed (timeout or rate limit): {e!r}")
+                if chunks:
+                    # Part of the explanation is already out; the caller must tell the client
+                    raise StreamInterruptedError(e, self._fallback_response(query, retrieval)) from e
                 print("Falling back to raw search results.")
-                # Fallback to raw results logic below...
-        
-        # 3. Fallback (or if LLM failed): Return raw search results formatted nicely
+            except BaseException:
+                # Cancelled, or the SSE client disconnected (GeneratorExit)
+                self.breaker.record_cancelled()
+                raise
+            finally:
+                record_stage("llm", time.perf_counter() - started)
+
+        yield self._fallback_response(query, retrieval)
+
+    def _model_name(self):
+        return getattr(self.llm, "model", None) or type(self.llm).__name__
+
+    def _cached_response(self, query, retrieval):
+        if not self.llm:
+            return None
+        return self.response_cache.get(
+            query, retrieval.cache_keys, PROMPT_VERSION, self._model_name(),
+            query_vector=retrieval.query_vector
+        )
+
+    def _cache_response(self, query, retrieval, response):
+        self.response_cache.put(
+            query, retrieval.cache_keys, PROMPT_VERSION, self._model_name(), response,
+            query_vector=retrieval.query_vector
+        )
+
+    def _allow_llm(self):
+        if self.breaker.allow_request():
+            return True
+        LLM_CALLS.labels("circuit_open").inc()
+        return False
+
+    def _invoke_llm(self, query, retrieval):
+        # Returns None when the caller should use the raw-results fallback
+        if not self.llm or not self._allow_llm():
+            return None
+        # The prompt is only built once a call will actually be made
+        inputs = self._chain_inputs(query, retrieval)
+        future = self._llm_executor.submit(self.chain.invoke, inputs)
+        try:
+            with timed("llm"):
+                response = future.result(timeout=self.llm_timeout)
+        except FuturesTimeoutError:
+            future.cancel()
+            self.breaker.record_failure()
+            LLM_CALLS.labels("timeout").inc()
+            print(f"LLM generation exceeded {self.llm_timeout}s deadline. Falling back to raw search results.")
+            return None
+        except Exception as e:
+            self.breaker.record_failure()
+            LLM_CALLS.labels("error").inc()
+            print(f"LLM generation failed (likely rate limit): {e}")
+            print("Falling back to raw search results.")
+            return None
+        self.breaker.record_success()
+        LLM_CALLS.labels("success").inc()
+        return response
+
+    async def _ainvoke_llm(self, query, retrieval):
+        if not self.llm or not self._allow_llm():
+            return None
+        inputs = self._chain_inputs(query, retrieval)
+        try:
+            with timed("llm"):
+                response = await asyncio.wait_for(self.chain.ainvoke(inputs), timeout=self.llm_timeout)
+        except asyncio.CancelledError:
+            # No outcome to record, but a half-open probe must not stay in flight
+            self.breaker.record_cancelled()
+            raise
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            LLM_CALLS.labels("timeout").inc()
+            print(f"LLM generation exceeded {self.llm_timeout}s deadline. Falling back to raw search results.")
+            return None
+        except Exception as e:
+            self.breaker.record_failure()
+            LLM_CALLS.labels("error").inc()
+            print(f"LLM generation failed (likely rate limit): {e}")
+            print("Falling back to raw search results.")
+            return None
+        self.breaker.record_success()
+        LLM_CALLS.labels("success").inc()
+        return response
+
+    def _build_chain(self):
+        if self.llm is None:
+            return None
+        # Using LCEL (LangChain Expression Language)
+        return PROMPT | self.llm | StrOutputParser()
+
+    def _chain_inputs(self, query, retrieval):
+        # Precomputed snippets in rank order, capped at LLM_CONTEXT_TOKENS
+        with timed("prompt"):
+            context, _ = self.context_builder.build(retrieval.rows)
+        return {"context": context, "query": query}
+
+    def _fallback_response(self, query, retrieval):
+        LLM_FALLBACKS.inc()
         results = "I couldn't generate a summarized recommendation due to high server load, but here are the most relevant assessments I found:\n\n"
         results += "Recommended Assessments\n"
-        
-        recommendations_list = []
-        
-        for i, doc in enumerate(retrieved_docs, 1):
-            meta = doc.metadata
-            
-            # Format duration nicely
-            duration = meta.get('duration', 'N/A')
-            if duration and duration != 'N/A' and 'minute' not in str(duration).lower():
-                duration_display = f"{duration} minutes"
-            else:
-                duration_display = duration
-
-            # Build text output
-            results += f"{i}. {meta.get('name', 'Unknown Title')}\n"
-            results += f"Test Type: {meta.get('test_type', 'N/A')}\n\n"
-            results += f"Description:\n{meta.get('description', 'No description available.')}\n\n"
-            results += f"Remote Testing: {meta.get('remote_support', 'N/A')}\n"
-            results += f"Adaptive/IRT: {meta.get('adaptive_support', 'N/A')}\n"
-            results += f"Duration: {duration_display}\n\n"
-            
-            # Construct structured data for JSON/CSV
-            json_data = {
-                "name": meta.get('name', 'N/A'),
-                "url": meta.get('url', 'N/A'),
-                "description": meta.get('description', 'N/A'),
-                "test_type": [t.strip() for t in str(meta.get('test_type', '')).split(',')] if meta.get('test_type') else [],
-                "remote_support": meta.get('remote_support', 'N/A'),
-                "adaptive_support": meta.get('adaptive_support', 'N/A'),
-                "duration": duration_display
-            }
-            recommendations_list.append(json_data)
-            
-            results += "🧩 Backend JSON (API response example)\n"
-            results += json.dumps(json_data, indent=2) + "\n\n"
-        
-        self._save_to_files(recommendations_list)
+
+        # Text blocks and records are precomputed per assessment at index load
+        entries = [self.payloads.fallback(row) for row in retrieval.rows]
+        results += "".join(f"{i}. {text}" for i, (text, _) in enumerate(entries, 1))
+
+        if self.result_sink is not None:
+            self.result_sink.submit({
+                "timestamp": time.time(),
+                "query": query,
+                "recommended_assessments": [record for _, record in entries]
+            })
         return results
 
 
 if __name__ == "__main__":
     # Test the engine
-    engine = AssessmentRecommendationEngine()
+    sink = ResultSink(RESULT_SINK_PATH, max_queue=RESULT_SINK_QUEUE_SIZE, batch_size=RESULT_SINK_BATCH_SIZE)
+    engine = AssessmentRecommendationEngine(result_sink=sink)
     test_query = "Data Warehousing Concepts"
     print(f"Query: {test_query}")
     print("-" * 50)
     try:
-        recommendation = engine.recommend(test_query)
+        recommendation, _ = engine.recommend(test_query)
         print(recommendation)
     except Exception as e:
         print(f"Error during recommendation: {e}")
+    finally:
+        sink.close()
 
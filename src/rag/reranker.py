@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.embeddings.embedder import load_cross_encoder
+from src.utils.text import clean_text
+
+
+class CrossEncoderReranker:
+    """Re-scores the top retrieval candidates with a cross-encoder.
+
+    All uncached (query, document) pairs of a call go through one batched
+    ``predict``; scores are cached per normalized query and document
+    fingerprint, so edited documents are rescored after a reload. The
+    reranker keeps a running estimate of the cost per pair and leaves the
+    retrieval order untouched when scoring the uncached pairs would exceed
+    ``budget_ms``.
+    """
+
+    def __init__(self, model_name, top_n=20, budget_ms=150, batch_size=32, cache_size=20000):
+        self.model_name = model_name
+        self.model = load_cross_encoder(model_name)
+        self.top_n = top_n
+        self.budget_ms = budget_ms
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+
+        # Running estimate of milliseconds per scored pair (None until measured)
+        self.ms_per_pair = None
+        self.reranked = 0
+        self.skipped = 0
+        self.cache_hits = 0
+
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+
+    def rerank(self, retrieval, k):
+        return self.rerank_many([retrieval], k)[0]
+
+    def rerank_many(self, retrievals, k):
+        """Rerank each ``RetrievalResult`` in place and truncate it to ``k`` documents.
+
+        Only the first ``top_n`` candidates are rescored; any further ones
+        follow them in their original order, scored as the lowest rescored one.
+        """
+        candidates = [min(len(retrieval), self.top_n) for retrieval in retrievals]
+
+        keys = []
+        for retrieval, n in zip(retrievals, candidates):
+            query = clean_text(retrieval.query)
+            keys.append([(query, doc_key) for doc_key in retrieval.cache_keys[:n]])
+
+        with self._lock:
+            scores = {key: self._scores[key] for pairs in keys for key in pairs if key in self._scores}
+            for key in scores:
+                self._scores.move_to_end(key)
+            self.cache_hits += len(scores)
+
+        missing = {}
+        for retrieval, pairs in zip(retrievals, keys):
+            for position, key in enumerate(pairs):
+                if key not in scores and key not in missing:
+                    missing[key] = (retrieval.query, retrieval.text(position))
+
+        if missing and not self._within_budget(len(missing)):
+            self.skipped += len(retrievals)
+            for retrieval in retrievals:
+                _truncate(retrieval, k)
+            return retrievals
+
+        if missing:
+            started = time.perf_counter()
+            predicted = self.model.predict(list(missing.values()), batch_size=self.batch_size)
+            self._record_cost(len(missing), (time.perf_counter() - started) * 1000)
+            predicted = dict(zip(missing, np.asarray(predicted, dtype=np.float32).tolist()))
+            scores.update(predicted)
+            with self._lock:
+                self._scores.update(predicted)
+                while len(self._scores) > self.cache_size:
+                    self._scores.popitem(last=False)
+
+        for retrieval, pairs, n in zip(retrievals, keys, candidates):
+            pair_scores = np.array([scores[key] for key in pairs], dtype=np.float32)
+            # Candidates beyond top_n keep their order after the rescored ones
+            order = np.concatenate([np.argsort(-pair_scores, kind="stable"), np.arange(n, len(retrieval))])[:k]
+            tail_score = float(pair_scores.min()) if n else 0.0
+            retrieval.reorder(order, scores=[float(pair_scores[i]) if i < n else tail_score for i in order])
+            retrieval.reranked = True
+            self.reranked += 1
+        return retrievals
+
+    def stats(self):
+        with self._lock:
+            cache_size = len(self._scores)
+        return {
+            "model": self.model_name,
+            "top_n": self.top_n,
+            "budget_ms": self.budget_ms,
+            "ms_per_pair": self.ms_per_pair,
+            "reranked": self.reranked,
+            "skipped": self.skipped,
+            "cache_size": cache_size,
+            "cache_hits": self.cache_hits
+        }
+
+    def _within_budget(self, pairs):
+        if self.ms_per_pair is None:
+            return True
+        if pairs * self.ms_per_pair <= self.budget_ms:
+            return True
+        # Decay the estimate on every skip so a transient slowdown is retried later
+        self.ms_per_pair *= 0.9
+        return False
+
+    def _record_cost(self, pairs, elapsed_ms):
+        cost = elapsed_ms / pairs
+        self.ms_per_pair = cost if self.ms_per_pair is None else 0.8 * self.ms_per_pair + 0.2 * cost
+
+
+def _truncate(retrieval, k):
+    retrieval.reorder(range(min(k, len(retrieval))))
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.utils.text import clean_text
+
+
+class ResponseCache:
+    """TTL + LRU cache of LLM explanations.
+
+    Entries are keyed on ``(normalized query, retrieved doc ids in order,
+    prompt version, model name)``. With ``similarity_threshold`` set, a miss
+    on the exact key can still reuse an answer whose query embedding has a
+    cosine similarity at or above the threshold, provided the retrieved
+    documents, prompt version and model are identical.
+    """
+
+    def __init__(self, max_size=1024, ttl=3600.0, similarity_threshold=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        # (doc ids, prompt version, model) -> keys sharing that context
+        self._by_context = {}
+        self._lock = threading.Lock()
+
+    def get(self, query, doc_ids, prompt_version, model_name, query_vector=None):
+        context = (tuple(doc_ids), prompt_version, model_name)
+        key = (clean_text(query),) + context
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._remove(key)
+
+            if self.similarity_threshold is not None and query_vector is not None:
+                response = self._nearest(context, _unit(query_vector), now)
+                if response is not None:
+                    self.near_hits += 1
+                    return response
+
+            self.misses += 1
+            return None
+
+    def put(self, query, doc_ids, prompt_version, model_name, response, query_vector=None):
+        context = (tuple(doc_ids), prompt_version, model_name)
+        key = (clean_text(query),) + context
+        vector = _unit(query_vector) if query_vector is not None else None
+        with self._lock:
+            self._entries[key] = (response, time.monotonic() + self.ttl, vector)
+            self._entries.move_to_end(key)
+            self._by_context.setdefault(context, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses
+            }
+
+    def _nearest(self, context, unit_vector, now):
+        candidates = [
+            key for key in self._by_context.get(context, ())
+            if self._entries[key][1] > now and self._entries[key][2] is not None
+        ]
+        if not candidates:
+            return None
+        similarities = np.stack([self._entries[key][2] for key in candidates]) @ unit_vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        self._entries.move_to_end(candidates[best])
+        return self._entries[candidates[best]][0]
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        context = key[1:]
+        keys = self._by_context.get(context)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_context[context]
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype="float32")
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
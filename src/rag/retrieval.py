@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+@dataclass
+class RetrievalResult:
+    """Outcome of a single query against the vector store.
+
+    Carries everything downstream stages need (LLM context, API payload,
+    evaluation) so a request only encodes and searches once. ``rows`` are
+    positions in the index; ``scores`` are in the units of the ranking that
+    produced them (cosine similarity for dense search, or L2 distance on
+    stores built before the index factory; pooled passage similarity for
+    chunked indexes, fused RRF score for hybrid search, cross-encoder score
+    once ``reranked``).
+
+    LangChain ``Document``s are only built when ``docs`` is first read; the
+    API path works on ``rows`` and the precomputed payloads instead.
+    """
+    query: str
+    query_vector: np.ndarray
+    scores: list = field(default_factory=list)
+    rows: list = field(default_factory=list)
+    # Document id plus row hash per doc; changes whenever a document does
+    fingerprints: list = field(default_factory=list)
+    reranked: bool = False
+    # Store the rows belong to, used to build documents on demand
+    store: object = field(default=None, repr=False, compare=False)
+    # Documents given up front (or built from ``store`` on first access)
+    documents: list | None = field(default=None, repr=False)
+
+    @property
+    def docs(self):
+        if self.documents is None:
+            self.documents = [self.store.document(i) for i in self.rows] if self.store is not None else []
+        return self.documents
+
+    def text(self, position):
+        """Indexed text of the result at ``position``, without building its document."""
+        if self.documents is not None:
+            return self.documents[position].page_content
+        return self.store.text(self.rows[position])
+
+    def reorder(self, order, scores=None):
+        """Keep the results at positions ``order``, in that order."""
+        self.rows = [self.rows[i] for i in order]
+        if self.fingerprints:
+            self.fingerprints = [self.fingerprints[i] for i in order]
+        self.scores = list(scores) if scores is not None else [self.scores[i] for i in order]
+        if self.documents is not None:
+            self.documents = [self.documents[i] for i in order]
+
+    @property
+    def doc_ids(self):
+        if self.documents is None and self.store is not None:
+            return [self.store.doc_id(i) for i in self.rows]
+        return [doc.id for doc in self.docs]
+
+    @property
+    def cache_keys(self):
+        # Caches shared across index versions must not match an edited document
+        return self.fingerprints or self.doc_ids
+
+    def __len__(self):
+        return len(self.documents) if self.documents is not None else len(self.rows)
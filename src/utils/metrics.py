@@ -0,0 +1,106 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Latency buckets in seconds, from sub-millisecond index lookups to slow LLM calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = Histogram(
+    "shl_stage_seconds", "Time spent per request stage", ["stage"], buckets=LATENCY_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "shl_request_seconds", "HTTP request latency by route", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+LLM_CALLS = Counter(
+    "shl_llm_calls_total", "LLM calls by outcome (success, timeout, error, circuit_open)", ["outcome"]
+)
+LLM_FALLBACKS = Counter(
+    "shl_llm_fallbacks_total", "Responses that fell back to the raw results text"
+)
+
+# Stage durations of the current request, when something is collecting them
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request_timings():
+    """Collect stage durations for the current request (and tasks / threads it starts)."""
+    timings = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def record_stage(stage, seconds):
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def server_timing(timings):
+    """Format stage durations as a ``Server-Timing`` header value (milliseconds)."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items())
+
+
+class EngineCollector:
+    """Reads index and cache state from the engine registry at scrape time.
+
+    The caches already count their hits and misses, so they are exported
+    as-is instead of being counted twice. ``get_registry`` returns the
+    current ``EngineRegistry`` or None while the engine is starting.
+    """
+
+    def __init__(self, get_registry):
+        self.get_registry = get_registry
+
+    def collect(self):
+        registry = self.get_registry()
+        if registry is None:
+            return
+
+        documents = GaugeMetricFamily("shl_index_documents", "Assessments in a loaded index", labels=["catalog"])
+        size = GaugeMetricFamily("shl_index_bytes", "On-disk size of a loaded index version", labels=["catalog"])
+        info = GaugeMetricFamily("shl_index_info", "Loaded index version (always 1)", labels=["catalog", "version"])
+        loaded = registry.loaded()
+        stats = registry.stats()
+        for catalog_id, engine in loaded:
+            documents.add_metric([catalog_id], len(engine.store))
+            info.add_metric([catalog_id, engine.index_version or "unversioned"], 1)
+            if catalog_id in stats["loaded"]:
+                size.add_metric([catalog_id], stats["loaded"][catalog_id]["bytes"])
+        yield documents
+        yield size
+        yield info
+        yield CounterMetricFamily("shl_catalog_evictions", "Catalog engines evicted from the cache", value=stats["evictions"])
+
+        # Models and caches are shared by every catalog's engine
+        engine = registry.default
+        hits = CounterMetricFamily("shl_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("shl_cache_misses", "Cache misses", labels=["cache"])
+        if engine.embeddings.cache is not None:
+            embedding = engine.embeddings.cache.stats()
+            hits.add_metric(["embedding"], embedding["hits"])
+            misses.add_metric(["embedding"], embedding["misses"])
+        response = engine.response_cache.stats()
+        hits.add_metric(["response"], response["hits"])
+        hits.add_metric(["response_similar"], response["near_hits"])
+        misses.add_metric(["response"], response["misses"])
+        if engine.reranker is not None:
+            hits.add_metric(["rerank"], engine.reranker.cache_hits)
+        yield hits
+        yield misses
+
+        circuit = engine.breaker.snapshot()
+        yield GaugeMetricFamily("shl_llm_circuit_open", "1 while the LLM circuit breaker is open",
+                                value=1 if circuit["state"] == "open" else 0)
@@ -0,0 +1,71 @@
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+
+
+class ResultSink:
+    """Append recommendation records to a JSONL file from a background thread.
+
+    ``submit`` never blocks the caller: records go into a bounded queue and
+    are dropped (and counted) when the queue is full. The writer thread
+    batches records into a single append + flush, and ``close`` drains
+    whatever is still queued before returning.
+    """
+
+    def __init__(self, path="outputs/results.jsonl", max_queue=1000, batch_size=50, flush_interval=1.0):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="result-sink", daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        if self._closed.is_set():
+            return False
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout=5.0):
+        self._closed.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        while not (self._closed.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def _next_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.1)))
+            except queue.Empty:
+                if self._closed.is_set():
+                    break
+        return batch
+
+    def _write(self, batch):
+        try:
+            lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            self.written += len(batch)
+        except Exception as e:
+            print(f"Error writing results to {self.path}: {e}")
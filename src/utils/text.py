@@ -1,7 +1,62 @@
 import re
 
+# Sentence ends, line breaks and bullet / numbered-list markers
+SEGMENT_SPLIT_RE = re.compile(r"(?:[.!?;]*[ \t]*\n+\s*(?:[-*\u2022\u00b7]\s*|\d+[.)]\s+)?|[.!?;]+\s+|\s+[-*\u2022\u00b7]\s+)")
+
 def clean_text(text: str) -> str:
     text = text.lower()
     text = re.sub(r"[^a-z0-9 ]", " ", text)
     text = re.sub(r"\s+", " ", text).strip()
     return text
+
+def chunk_text(text: str, chunk_words: int = 128, overlap: int = 32) -> list:
+    """Split text into overlapping word windows (always at least one chunk)."""
+    words = text.split()
+    if len(words) <= chunk_words:
+        return [" ".join(words)]
+    step = max(chunk_words - overlap, 1)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words):
+            break
+    return chunks
+
+def split_segments(text: str, min_words: int = 4, max_segments: int = 16) -> list:
+    """Split a long query (e.g. a pasted job description) into sentences / bullets.
+
+    Fragments shorter than ``min_words`` are merged into the previous
+    segment, or into the next one when they lead (e.g. a "Job Description"
+    heading); beyond ``max_segments`` the tail is merged into the last one.
+    """
+    segments = []
+    # Short leading fragments waiting for a segment to attach to
+    pending = ""
+    for part in SEGMENT_SPLIT_RE.split(text):
+        part = part.strip()
+        if not part:
+            continue
+        if pending:
+            part = f"{pending} {part}"
+            pending = ""
+        if len(part.split()) >= min_words:
+            segments.append(part)
+        elif segments:
+            segments[-1] = f"{segments[-1]} {part}"
+        else:
+            pending = part
+    if pending:
+        segments.append(pending)
+    if len(segments) > max_segments:
+        segments = segments[:max_segments - 1] + [" ".join(segments[max_segments - 1:])]
+    return segments
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token for English)."""
+    return max(1, (len(text) + 3) // 4)
+
+def truncate_words(text: str, max_words: int) -> str:
+    words = text.split()
+    if len(words) <= max_words:
+        return " ".join(words)
+    return " ".join(words[:max_words]) + " …"
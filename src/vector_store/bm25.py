@@ -0,0 +1,117 @@
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.text import clean_text
+
+
+BM25_FILE = "bm25.npz"
+
+
+class BM25Index:
+    """Array-backed BM25 inverted index over ``combined_text``.
+
+    Postings are stored CSR-style per term (``indptr`` into ``postings`` /
+    ``weights``) with the full BM25 term weight precomputed, so scoring a
+    query is one ``np.bincount`` over the postings of its terms.
+    """
+
+    def __init__(self, terms, indptr, postings, weights, count):
+        self.terms = terms
+        self.indptr = indptr
+        self.postings = postings
+        self.weights = weights
+        self.count = int(count)
+        self.vocab = {term: i for i, term in enumerate(terms.tolist())}
+
+    @classmethod
+    def build(cls, texts, k1=1.5, b=0.75):
+        docs = [clean_text(text).split() for text in texts]
+        count = len(docs)
+        lengths = np.array([len(tokens) for tokens in docs], dtype=np.float32)
+        avg_length = lengths.mean() if count and lengths.mean() > 0 else 1.0
+
+        # term -> {doc: term frequency}
+        inverted = {}
+        for doc, tokens in enumerate(docs):
+            for token in tokens:
+                freqs = inverted.setdefault(token, {})
+                freqs[doc] = freqs.get(doc, 0) + 1
+
+        terms = sorted(inverted)
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        postings, weights = [], []
+        for t, term in enumerate(terms):
+            rows = np.fromiter(inverted[term].keys(), dtype=np.int32)
+            tf = np.fromiter(inverted[term].values(), dtype=np.float32)
+            idf = np.log(1.0 + (count - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = tf + k1 * (1.0 - b + b * lengths[rows] / avg_length)
+            postings.append(rows)
+            weights.append((idf * tf * (k1 + 1.0) / norm).astype(np.float32))
+            indptr[t + 1] = indptr[t] + len(rows)
+
+        return cls(
+            np.array(terms, dtype=str),
+            indptr,
+            np.concatenate(postings) if postings else np.zeros(0, dtype=np.int32),
+            np.concatenate(weights) if weights else np.zeros(0, dtype=np.float32),
+            count
+        )
+
+    def nbytes(self):
+        """Estimated memory of the arrays plus the term -> id dict."""
+        arrays = self.terms.nbytes + self.indptr.nbytes + self.postings.nbytes + self.weights.nbytes
+        return arrays + sys.getsizeof(self.vocab) + sum(sys.getsizeof(term) for term in self.vocab)
+
+    def scores(self, query):
+        term_ids = [self.vocab[token] for token in set(clean_text(query).split()) if token in self.vocab]
+        if not term_ids:
+            return np.zeros(self.count, dtype=np.float32)
+        slices = [slice(self.indptr[t], self.indptr[t + 1]) for t in term_ids]
+        rows = np.concatenate([self.postings[s] for s in slices])
+        weights = np.concatenate([self.weights[s] for s in slices])
+        return np.bincount(rows, weights=weights, minlength=self.count).astype(np.float32)
+
+    def top_k(self, query, k, row_mask=None):
+        """Return ``(rows, scores)`` of the best ``k`` rows with a non-zero score."""
+        scores = self.scores(query)
+        if row_mask is not None:
+            scores[~row_mask] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        order = np.argsort(-scores[candidates], kind="stable")
+        return candidates[order], scores[candidates[order]]
+
+    def save(self, path):
+        path = Path(path)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                terms=self.terms,
+                indptr=self.indptr,
+                postings=self.postings,
+                weights=self.weights,
+                count=np.array(self.count)
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["terms"], data["indptr"], data["postings"], data["weights"], data["count"])
+
+
+def reciprocal_rank_fusion(rankings, weights, count, k, rrf_k=60):
+    """Fuse ranked row arrays with weighted RRF; returns ``(rows, fused_scores)`` for the top ``k``."""
+    fused = np.zeros(count, dtype=np.float32)
+    for rows, weight in zip(rankings, weights):
+        fused[rows] += weight / (rrf_k + np.arange(1, len(rows) + 1, dtype=np.float32))
+    candidates = np.flatnonzero(fused)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-fused[candidates], k - 1)[:k]]
+    order = np.argsort(-fused[candidates], kind="stable")
+    return candidates[order], fused[candidates[order]]
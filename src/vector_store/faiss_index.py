@@ -1,12 +1,130 @@
 import faiss
 import numpy as np
 
-def build_faiss_index(embeddings):
+from src.config import (
+    INDEX_TYPE, INDEX_HNSW_MIN_ITEMS, INDEX_IVFPQ_MIN_ITEMS,
+    HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH,
+    IVF_NPROBE, PQ_M, PQ_NBITS, IVF_REFINE_FACTOR
+)
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+# FAISS needs roughly this many training points per IVF list
+_IVF_POINTS_PER_LIST = 39
+
+
+def choose_index_type(count):
+    """Pick an index type from the number of vectors (used for ``INDEX_TYPE = "auto"``)."""
+    if count >= INDEX_IVFPQ_MIN_ITEMS:
+        return "ivfpq"
+    if count >= INDEX_HNSW_MIN_ITEMS:
+        return "hnsw"
+    return "flat"
+
+
+def index_params(count, dim, index_type=None):
+    """Resolve the full build / search parameters for an index over ``count`` vectors.
+
+    Every index searches by inner product over L2-normalized vectors, i.e.
+    cosine similarity. The returned dict is recorded in the store manifest.
+    """
+    index_type = index_type or INDEX_TYPE
+    if index_type == "auto":
+        index_type = choose_index_type(count)
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES} or 'auto'")
+
+    params = {"type": index_type, "metric": "ip", "normalized": True}
+    if index_type == "hnsw":
+        params.update(m=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION, ef_search=HNSW_EF_SEARCH)
+    elif index_type == "ivfpq":
+        nlist = max(1, min(int(4 * np.sqrt(count)), count // _IVF_POINTS_PER_LIST))
+        # PQ sub-quantizers must divide the dimension
+        m = max(d for d in range(1, min(PQ_M, dim) + 1) if dim % d == 0)
+        # Each sub-quantizer trains 2**nbits centroids
+        nbits = max(1, min(PQ_NBITS, int(np.log2(max(count, 2)))))
+        params.update(
+            nlist=nlist, m=m, nbits=nbits, nprobe=min(IVF_NPROBE, nlist), refine=IVF_REFINE_FACTOR
+        )
+    return params
+
+
+def normalize(vectors):
+    vectors = np.array(vectors, dtype="float32", copy=True)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def build_faiss_index(embeddings, params=None):
+    """Build an index for ``embeddings`` as described by ``index_params``.
+
+    Without ``params`` this is the original flat L2 index over the raw
+    vectors. With ``params``, ``embeddings`` must already be normalized.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
     dim = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dim)
-    index.add(np.array(embeddings).astype("float32"))
+    if params is None:
+        index = faiss.IndexFlatL2(dim)
+    elif params["type"] == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif params["type"] == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["m"], faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = params["ef_construction"]
+    elif params["type"] == "ivfpq":
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(
+            quantizer, dim, params["nlist"], params["m"], params["nbits"], faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(embeddings)
+    else:
+        raise ValueError(f"Unknown index type '{params['type']}'")
+
+    index.add(embeddings)
+    if params is not None:
+        configure_search(index, params)
     return index
 
+
+def configure_search(index, params):
+    """Apply search-time parameters, which FAISS does not always persist."""
+    if params.get("type") == "hnsw":
+        index.hnsw.efSearch = params["ef_search"]
+    elif params.get("type") == "ivfpq":
+        faiss.extract_index_ivf(index).nprobe = params["nprobe"]
+
+
+def search_parameters(index, selector):
+    """FAISS search parameters restricting ``index`` to ``selector``, keeping its tuning."""
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    if isinstance(index, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+    return faiss.SearchParameters(sel=selector)
+
+
+def search_with_refine(index, vectors, query_vectors, k, refine=None, params=None):
+    """Search ``index``; with ``refine``, over-fetch and re-score candidates exactly.
+
+    ``vectors`` are the normalized vectors the index was built from (they
+    may be memory-mapped); only the fetched candidates are read.
+    """
+    if not refine:
+        return index.search(query_vectors, k, params=params)
+
+    fetch = min(k * refine, index.ntotal)
+    _, candidates = index.search(query_vectors, fetch, params=params)
+    scores = np.full((len(query_vectors), k), -np.inf, dtype="float32")
+    indices = np.full((len(query_vectors), k), -1, dtype="int64")
+    for i, (query, rows) in enumerate(zip(query_vectors, candidates)):
+        # Sorted rows keep reads from memory-mapped vectors sequential
+        rows = np.sort(rows[rows != -1])
+        exact = np.asarray(vectors[rows]) @ query
+        order = np.argsort(-exact, kind="stable")[:k]
+        scores[i, :len(order)] = exact[order]
+        indices[i, :len(order)] = rows[order]
+    return scores, indices
+
+
 def search_index(index, query_vec, top_k):
     scores, idx = index.search(query_vec.astype("float32"), top_k)
     return idx[0]
@@ -0,0 +1,129 @@
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+
+_NUMBER = re.compile(r"\d+")
+
+
+@dataclass
+class SearchFilters:
+    """Structured constraints applied before the vector search.
+
+    ``None`` means "no constraint". ``test_types`` matches assessments having
+    any of the given type codes. Durations are inclusive minutes: an
+    assessment matches when its whole stated range lies within
+    ``[min_duration, max_duration]``; one without a known duration never
+    matches a duration filter.
+    """
+    remote_support: bool | None = None
+    adaptive_support: bool | None = None
+    test_types: list[str] | None = None
+    min_duration: float | None = None
+    max_duration: float | None = None
+
+    def is_empty(self):
+        return (
+            self.remote_support is None
+            and self.adaptive_support is None
+            and not self.test_types
+            and self.min_duration is None
+            and self.max_duration is None
+        )
+
+
+class MetadataFilterIndex:
+    """Per-field bitsets and sorted arrays built once from an index's metadata.
+
+    ``mask()`` combines them into a boolean row mask that the store turns
+    into a FAISS ID selector, so filtering happens inside the search instead
+    of over-fetching and discarding results afterwards.
+    """
+
+    def __init__(self, store):
+        self.count = len(store)
+        self.remote = self._yes_bits(store, "remote_support")
+        self.adaptive = self._yes_bits(store, "adaptive_support")
+
+        self.test_types = {}
+        if "test_type" in store.columns:
+            for i, value in enumerate(store.columns["test_type"].tolist()):
+                for code in value.split(","):
+                    code = code.strip().upper()
+                    if code:
+                        self.test_types.setdefault(code, np.zeros(self.count, dtype=bool))[i] = True
+
+        # Rows sorted by their lower / upper duration bound, so each side of a
+        # range filter is a single binary search
+        low, high = self._duration_bounds(store)
+        self.min_rows, self.min_sorted = _sorted_known(low)
+        self.max_rows, self.max_sorted = _sorted_known(high)
+
+    def mask(self, filters):
+        """Return a boolean mask of matching rows, or None when nothing is filtered."""
+        if filters is None or filters.is_empty():
+            return None
+
+        mask = np.ones(self.count, dtype=bool)
+        if filters.remote_support is not None:
+            mask &= self.remote if filters.remote_support else ~self.remote
+        if filters.adaptive_support is not None:
+            mask &= self.adaptive if filters.adaptive_support else ~self.adaptive
+        if filters.test_types:
+            any_type = np.zeros(self.count, dtype=bool)
+            for code in filters.test_types:
+                bits = self.test_types.get(code.strip().upper())
+                if bits is not None:
+                    any_type |= bits
+            mask &= any_type
+        if filters.min_duration is not None:
+            start = np.searchsorted(self.min_sorted, filters.min_duration, side="left")
+            mask &= self._rows_mask(self.min_rows[start:])
+        if filters.max_duration is not None:
+            end = np.searchsorted(self.max_sorted, filters.max_duration, side="right")
+            mask &= self._rows_mask(self.max_rows[:end])
+        return mask
+
+    def nbytes(self):
+        arrays = [self.remote, self.adaptive, self.min_rows, self.min_sorted, self.max_rows, self.max_sorted]
+        return sum(array.nbytes for array in arrays) + sum(bits.nbytes for bits in self.test_types.values())
+
+    def type_bits(self, rows):
+        """Return ``(codes, bits)``: the test type codes and a (rows x codes) membership matrix."""
+        codes = sorted(self.test_types)
+        bits = np.zeros((len(rows), len(codes)), dtype=bool)
+        for j, code in enumerate(codes):
+            bits[:, j] = self.test_types[code][rows]
+        return codes, bits
+
+    def _rows_mask(self, rows):
+        mask = np.zeros(self.count, dtype=bool)
+        mask[rows] = True
+        return mask
+
+    def _yes_bits(self, store, field):
+        if field not in store.columns:
+            return np.zeros(self.count, dtype=bool)
+        return np.array([value.strip().lower() == "yes" for value in store.columns[field].tolist()], dtype=bool)
+
+    def _duration_bounds(self, store):
+        # Typed minutes from ingestion; -1 marks an unknown duration
+        if "duration_min" in store.arrays and "duration_max" in store.arrays:
+            return np.asarray(store.arrays["duration_min"]), np.asarray(store.arrays["duration_max"])
+
+        # Stores built before typed durations existed: parse the text once here
+        low = np.full(self.count, -1)
+        high = np.full(self.count, -1)
+        if "duration" in store.columns:
+            for i, value in enumerate(store.columns["duration"].tolist()):
+                numbers = [int(n) for n in _NUMBER.findall(value)]
+                if numbers:
+                    low[i], high[i] = min(numbers), max(numbers)
+        return low, high
+
+
+def _sorted_known(values):
+    known = np.flatnonzero(values >= 0)
+    order = np.argsort(values[known], kind="stable")
+    return known[order], values[known][order]
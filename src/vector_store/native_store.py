@@ -0,0 +1,407 @@
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.vector_store.bm25 import BM25Index, BM25_FILE
+from src.vector_store.faiss_index import (
+    build_faiss_index, index_params, configure_search, search_parameters, search_with_refine, normalize
+)
+
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+SEARCH_INDEX_FILE = "search.faiss"
+PASSAGE_VECTORS_FILE = "passages.npy"
+PASSAGE_INDEX_FILE = "passages.faiss"
+PASSAGE_ROWS_FILE = "passage_rows.npy"
+COLUMNS_DIR = "columns"
+
+# Column holding the embedded text (LangChain's page_content)
+TEXT_FIELD = "combined_text"
+ID_FIELD = "id"
+# Written by incremental indexing: hash of the embedded text / of the whole row
+CONTENT_HASH_FIELD = "content_hash"
+ROW_HASH_FIELD = "row_hash"
+
+
+class StringColumn:
+    """Read-only string column backed by a UTF-8 blob and an offsets array.
+
+    Both files are memory-mapped, so a row is decoded only when accessed.
+    """
+
+    def __init__(self, blob_path, offsets_path):
+        self.offsets = np.load(offsets_path, mmap_mode="r")
+        if Path(blob_path).stat().st_size:
+            self.blob = np.memmap(blob_path, dtype=np.uint8, mode="r")
+        else:
+            self.blob = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def tolist(self):
+        return [self[i] for i in range(len(self))]
+
+    @staticmethod
+    def write(values, blob_path, offsets_path):
+        encoded = [str(value).encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+        with open(blob_path, "wb") as f:
+            f.write(b"".join(encoded))
+        np.save(offsets_path, offsets)
+
+
+class NativeIndexStore:
+    """Pickle-free on-disk index: raw vectors, a FAISS index and columnar metadata.
+
+    Layout of ``path``::
+
+        manifest.json          format version, count, dim, metric, index build params, columns
+        vectors.npy            float32 (count, dim), memory-mapped on load
+        search.faiss           FAISS index, memory-mapped where FAISS supports it
+        columns/<field>.bin    UTF-8 values, concatenated
+        columns/<field>.off.npy  int64 offsets (count + 1) into the .bin file
+        columns/<field>.npy    typed (numeric / boolean) fields, one value per row
+
+    Chunked indexes additionally hold one vector per passage
+    (``passages.npy`` / ``passages.faiss``) and ``passage_rows.npy``, the
+    int32 row each passage belongs to.
+
+    Every file is either raw arrays or FAISS' own format, so several worker
+    processes opening the same store share pages through the OS cache.
+
+    Stores built with an index factory type (``manifest["index"]``) hold
+    L2-normalized vectors and normalize queries before searching; older
+    stores without it are flat L2 over the raw vectors.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format {self.manifest.get('format')} in {self.path}")
+
+        self.count = self.manifest["count"]
+        self.dim = self.manifest["dim"]
+        self.metric = self.manifest["metric"]
+        self.index_params = self.manifest.get("index", {"type": "flat", "metric": "l2", "normalized": False})
+        self.normalized = self.index_params.get("normalized", False)
+        self.vectors = np.load(self.path / VECTORS_FILE, mmap_mode="r")
+        self.index = _read_index(self.path / SEARCH_INDEX_FILE)
+        configure_search(self.index, self.index_params)
+
+        self.columns = {
+            field: StringColumn(
+                self.path / COLUMNS_DIR / f"{field}.bin",
+                self.path / COLUMNS_DIR / f"{field}.off.npy"
+            )
+            for field in self.manifest["columns"]
+        }
+        self.metadata_fields = [
+            field for field in self.manifest["columns"]
+            if field not in (TEXT_FIELD, ID_FIELD, CONTENT_HASH_FIELD, ROW_HASH_FIELD)
+        ]
+        self.arrays = {
+            field: np.load(self.path / COLUMNS_DIR / f"{field}.npy", mmap_mode="r")
+            for field in self.manifest.get("arrays", [])
+        }
+
+        self.passage_count = self.manifest.get("passages", 0)
+        self.passage_index = None
+        self.passage_rows = None
+        self.passage_vectors = None
+        if self.passage_count:
+            self.passage_vectors = np.load(self.path / PASSAGE_VECTORS_FILE, mmap_mode="r")
+            self.passage_index = _read_index(self.path / PASSAGE_INDEX_FILE)
+            configure_search(self.passage_index, self.manifest.get("passage_index", {}))
+            self.passage_rows = np.load(self.path / PASSAGE_ROWS_FILE, mmap_mode="r")
+
+    @staticmethod
+    def exists(path):
+        return (Path(path) / MANIFEST_FILE).exists()
+
+    def __len__(self):
+        return self.count
+
+    def metadata(self, i):
+        return {field: self.columns[field][i] for field in self.metadata_fields}
+
+    def document(self, i):
+        return Document(
+            id=self.columns[ID_FIELD][i],
+            page_content=self.columns[TEXT_FIELD][i],
+            metadata=self.metadata(i)
+        )
+
+    def doc_id(self, i):
+        return self.columns[ID_FIELD][i]
+
+    def text(self, i):
+        return self.columns[TEXT_FIELD][i]
+
+    def fingerprint(self, i):
+        """Document id plus a hash of everything indexed for it; changes whenever the row does."""
+        if ROW_HASH_FIELD in self.columns:
+            return f"{self.columns[ID_FIELD][i]}@{self.columns[ROW_HASH_FIELD][i]}"
+        return self.columns[ID_FIELD][i]
+
+    def search(self, query_vectors, k, row_mask=None):
+        """Search the FAISS index, optionally restricted to rows where ``row_mask`` is True."""
+        return _masked_search(
+            self.index, self._prepare(query_vectors), k, row_mask,
+            vectors=self.vectors, refine=self.index_params.get("refine")
+        )
+
+    def search_passages(self, query_vectors, k, row_mask=None):
+        """Search passage vectors; ``row_mask`` is per assessment row and is mapped onto passages."""
+        passage_mask = None if row_mask is None else row_mask[self.passage_rows]
+        passage_params = self.manifest.get("passage_index") or {}
+        return _masked_search(
+            self.passage_index, self._prepare(query_vectors), k, passage_mask,
+            vectors=self.passage_vectors, refine=passage_params.get("refine")
+        )
+
+    def _prepare(self, query_vectors):
+        return normalize(query_vectors) if self.normalized else query_vectors
+
+    def similarity(self, scores):
+        """Map raw FAISS scores to similarities where higher is better and values are positive."""
+        if self.metric == "l2":
+            return 1.0 / (1.0 + np.maximum(scores, 0.0))
+        return np.maximum(scores, 0.0)
+
+    @classmethod
+    def build(cls, path, vectors, columns, arrays=None, passages=None, embedding_model=None, index_type=None,
+              info=None):
+        """Write a new store to ``path`` and return it opened.
+
+        ``columns`` maps field name to a list of string values (one per
+        vector) and must contain ``id`` and ``combined_text``; ``arrays``
+        maps field name to a typed numpy array of the same length.
+        ``passages`` is an optional ``(passage_vectors, passage_rows)`` pair
+        for chunked indexing. ``index_type`` overrides ``INDEX_TYPE``; the
+        resolved build parameters are recorded in the manifest, along with
+        any ``info`` (e.g. version and change counts).
+        """
+        arrays = arrays or {}
+        path = Path(path)
+        vectors = normalize(vectors)
+        params = index_params(len(vectors), vectors.shape[1], index_type)
+        for field in (ID_FIELD, TEXT_FIELD):
+            if field not in columns:
+                raise ValueError(f"Missing required column '{field}'")
+
+        (path / COLUMNS_DIR).mkdir(parents=True, exist_ok=True)
+        np.save(path / VECTORS_FILE, vectors)
+        faiss.write_index(build_faiss_index(vectors, params), str(path / SEARCH_INDEX_FILE))
+        for field, values in columns.items():
+            if len(values) != len(vectors):
+                raise ValueError(f"Column '{field}' has {len(values)} values for {len(vectors)} vectors")
+            StringColumn.write(
+                values,
+                path / COLUMNS_DIR / f"{field}.bin",
+                path / COLUMNS_DIR / f"{field}.off.npy"
+            )
+        for field, values in arrays.items():
+            values = np.asarray(values)
+            if len(values) != len(vectors):
+                raise ValueError(f"Array '{field}' has {len(values)} values for {len(vectors)} vectors")
+            np.save(path / COLUMNS_DIR / f"{field}.npy", values)
+
+        passage_count = 0
+        passage_params = None
+        if passages is not None:
+            passage_vectors, passage_rows = passages
+            passage_vectors = normalize(passage_vectors)
+            passage_params = index_params(len(passage_vectors), passage_vectors.shape[1], index_type)
+            np.save(path / PASSAGE_VECTORS_FILE, passage_vectors)
+            np.save(path / PASSAGE_ROWS_FILE, np.asarray(passage_rows, dtype=np.int32))
+            faiss.write_index(build_faiss_index(passage_vectors, passage_params), str(path / PASSAGE_INDEX_FILE))
+            passage_count = int(passage_vectors.shape[0])
+
+        # The manifest goes last: a directory without one is an incomplete build
+        manifest = {
+            "format": FORMAT_VERSION,
+            "count": int(vectors.shape[0]),
+            "dim": int(vectors.shape[1]),
+            "metric": params["metric"],
+            "index": params,
+            "embedding_model": embedding_model,
+            "columns": list(columns),
+            "arrays": list(arrays),
+            "passages": passage_count,
+            "passage_index": passage_params,
+            **(info or {})
+        }
+        with open(path / MANIFEST_FILE, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return cls(path)
+
+
+# Manifest entries written by build() itself
+_BUILD_KEYS = {
+    "format", "count", "dim", "metric", "index", "embedding_model", "columns", "arrays", "passages", "passage_index"
+}
+
+
+def _masked_search(index, query_vectors, k, mask, vectors=None, refine=None):
+    query_vectors = np.ascontiguousarray(query_vectors, dtype="float32")
+    if mask is None:
+        return search_with_refine(index, vectors, query_vectors, k, refine)
+
+    # FAISS reads the bitmap LSB-first; keep `bits` alive for the whole search
+    bits = np.packbits(mask, bitorder="little")
+    params = search_parameters(index, faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits)))
+    return search_with_refine(index, vectors, query_vectors, k, refine, params=params)
+
+
+def _read_index(path):
+    # Memory-map flat index storage when this FAISS build supports it
+    mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+    if mmap_flag is not None:
+        try:
+            return faiss.read_index(str(path), mmap_flag)
+        except RuntimeError:
+            pass
+    return faiss.read_index(str(path))
+
+
+def catalog_columns(df, array_fields=()):
+    """Split a ``load_catalog`` DataFrame into ``(columns, arrays)`` for ``NativeIndexStore.build``.
+
+    Fields listed in ``array_fields`` keep their dtype; everything else is
+    stored as text.
+    """
+    arrays = {field: df[field].to_numpy() for field in array_fields if field in df.columns}
+    text_df = df.drop(columns=list(arrays)).fillna("")
+    columns = {field: text_df[field].astype(str).tolist() for field in text_df.columns}
+    columns[ID_FIELD] = _stable_ids(columns)
+    return columns, arrays
+
+
+def _stable_ids(columns):
+    # Document ids follow the product URL (or name, per row) so they survive rebuilds
+    count = len(columns[TEXT_FIELD])
+    urls = columns.get("url") or [""] * count
+    names = columns.get("name") or [""] * count
+    seen = {}
+    ids = []
+    for i, (url, name) in enumerate(zip(urls, names)):
+        key = url or name or f"row-{i}"
+        seen[key] = seen.get(key, 0) + 1
+        ids.append(key if seen[key] == 1 else f"{key}#{seen[key]}")
+    return ids
+
+
+def convert_langchain_index(index_path, output_path=None):
+    """One-off migration of a LangChain ``FAISS.save_local`` directory.
+
+    This is the only place the legacy ``index.pkl`` is unpickled; only run it
+    on an index you built yourself.
+    """
+    import pickle
+
+    index_path = Path(index_path)
+    output_path = Path(output_path or index_path)
+    legacy_index = faiss.read_index(str(index_path / "index.faiss"))
+    with open(index_path / "index.pkl", "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    vectors = legacy_index.reconstruct_n(0, legacy_index.ntotal)
+    docs = [docstore.search(index_to_docstore_id[i]) for i in range(legacy_index.ntotal)]
+
+    fields = []
+    for doc in docs:
+        for field in doc.metadata:
+            if field not in fields and field not in (TEXT_FIELD, ID_FIELD):
+                fields.append(field)
+
+    columns = {field: [str(doc.metadata.get(field, "")) for doc in docs] for field in fields}
+    columns[TEXT_FIELD] = [doc.page_content for doc in docs]
+    columns[ID_FIELD] = _stable_ids(columns)
+    return NativeIndexStore.build(output_path, vectors, columns)
+
+
+def reindex_store(index_path, output_path=None, index_type=None, info=None):
+    """Rebuild the FAISS index(es) of a native store, e.g. to change ``INDEX_TYPE``.
+
+    Vectors and columns are reused as they are, so nothing is re-embedded.
+    Extra manifest entries (version, change counts) are carried over and
+    updated with ``info``.
+    """
+    store = NativeIndexStore(index_path)
+    vectors = np.array(store.vectors)
+    columns = {field: column.tolist() for field, column in store.columns.items()}
+    arrays = {field: np.array(values) for field, values in store.arrays.items()}
+    passages = None
+    if store.passage_count:
+        passages = (np.array(store.passage_vectors), np.array(store.passage_rows))
+    embedding_model = store.manifest.get("embedding_model")
+    info = {**{key: value for key, value in store.manifest.items() if key not in _BUILD_KEYS}, **(info or {})}
+    source = store.path
+    del store
+
+    rebuilt = NativeIndexStore.build(
+        output_path or index_path,
+        vectors,
+        columns,
+        arrays=arrays,
+        passages=passages,
+        embedding_model=embedding_model,
+        index_type=index_type,
+        info=info
+    )
+    # The lexical index only depends on the text, so it carries over as is
+    if (source / BM25_FILE).exists() and rebuilt.path.resolve() != source.resolve():
+        shutil.copy2(source / BM25_FILE, rebuilt.path / BM25_FILE)
+    elif not (rebuilt.path / BM25_FILE).exists():
+        BM25Index.build(columns["combined_text"]).save(rebuilt.path / BM25_FILE)
+    return rebuilt
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a LangChain FAISS index to the native format")
+    parser.add_argument("index_path", nargs="?", default="data/faiss_index")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--reindex", action="store_true", help="rebuild the FAISS index of an existing native store")
+    parser.add_argument("--index-type", default=None, choices=["auto", "flat", "hnsw", "ivfpq"])
+    args = parser.parse_args()
+
+    if args.reindex:
+        from src.vector_store.versions import (
+            current_version, resolve_index_path, next_version, staging_path, publish_version
+        )
+
+        if args.output is None and current_version(args.index_path) is not None:
+            # Versioned index: rebuild into a new version instead of rewriting the live one
+            version = next_version(args.index_path)
+            reindex_store(
+                resolve_index_path(args.index_path),
+                staging_path(args.index_path, version),
+                args.index_type,
+                info={"version": version, "parent": current_version(args.index_path), "changes": None}
+            )
+            store = NativeIndexStore(publish_version(args.index_path, version))
+        else:
+            store = reindex_store(args.index_path, args.output, args.index_type)
+    else:
+        store = convert_langchain_index(args.index_path, args.output)
+    print(f"Wrote native index with {len(store)} vectors ({store.index_params['type']}) to {store.path}")
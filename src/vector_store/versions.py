@@ -0,0 +1,71 @@
+import os
+import shutil
+from pathlib import Path
+
+from src.vector_store.native_store import NativeIndexStore
+
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+
+def current_version(root):
+    """Name of the version ``CURRENT`` points at, or None for an unversioned index."""
+    current = Path(root) / CURRENT_FILE
+    if not current.exists():
+        return None
+    return current.read_text(encoding="utf-8").strip() or None
+
+
+def resolve_index_path(root):
+    """Directory of the store to open: the ``CURRENT`` version, else ``root`` itself.
+
+    Indexes written before versioning keep their files directly in ``root``.
+    """
+    version = current_version(root)
+    if version is not None:
+        return Path(root) / VERSIONS_DIR / version
+    return Path(root)
+
+
+def next_version(root):
+    versions = list_versions(root)
+    number = int(versions[-1][1:]) + 1 if versions else 1
+    return f"v{number:06d}"
+
+
+def list_versions(root):
+    versions_dir = Path(root) / VERSIONS_DIR
+    if not versions_dir.exists():
+        return []
+    return sorted(
+        path.name for path in versions_dir.iterdir()
+        if path.is_dir() and path.name.startswith("v") and path.name[1:].isdigit()
+    )
+
+
+def staging_path(root, version):
+    # Builds go to a hidden sibling and are renamed into place when complete
+    return Path(root) / VERSIONS_DIR / f".{version}.tmp"
+
+
+def publish_version(root, version, keep=3):
+    """Move a finished staging build into place and point ``CURRENT`` at it.
+
+    Both steps are atomic renames, so readers see either the old or the new
+    version, never a partial one. Only the newest ``keep`` versions are kept.
+    """
+    root = Path(root)
+    staged = staging_path(root, version)
+    if not NativeIndexStore.exists(staged):
+        raise ValueError(f"No complete index to publish at {staged}")
+    os.replace(staged, root / VERSIONS_DIR / version)
+
+    pointer = root / f"{CURRENT_FILE}.tmp"
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, root / CURRENT_FILE)
+
+    for old in list_versions(root)[:-keep] if keep else []:
+        if old != version:
+            shutil.rmtree(root / VERSIONS_DIR / old, ignore_errors=True)
+    return root / VERSIONS_DIR / version
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from src.vector_store.native_store import NativeIndexStore
+
+
+@pytest.fixture
+def build_store(tmp_path):
+    """Write a small flat store to ``tmp_path`` from metadata dicts and vectors."""
+
+    def build(rows, vectors, arrays=None):
+        fields = sorted({field for row in rows for field in row})
+        columns = {field: [str(row.get(field, "")) for row in rows] for field in fields}
+        columns.setdefault("id", [f"doc-{i}" for i in range(len(rows))])
+        return NativeIndexStore.build(
+            tmp_path / "store", np.asarray(vectors, dtype="float32"), columns, arrays=arrays, index_type="flat"
+        )
+
+    return build
@@ -0,0 +1,78 @@
+import asyncio
+
+from src.rag.circuit_breaker import CircuitBreaker
+from src.rag.rag_engine import AssessmentRecommendationEngine
+from src.rag.retrieval import RetrievalResult
+
+
+class _SlowChain:
+    async def ainvoke(self, inputs):
+        await asyncio.sleep(10)
+
+    async def astream(self, inputs):
+        yield "first chunk"
+        await asyncio.sleep(10)
+        yield "never sent"
+
+
+def _half_open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def _engine(breaker):
+    # Only the LLM-facing attributes are needed; no index or models are loaded
+    engine = AssessmentRecommendationEngine.__new__(AssessmentRecommendationEngine)
+    engine.llm = object()
+    engine.chain = _SlowChain()
+    engine.breaker = breaker
+    engine.llm_timeout = 30.0
+    engine._cached_response = lambda query, retrieval: None
+    engine._chain_inputs = lambda query, retrieval: {"context": "", "query": query}
+    return engine
+
+
+def test_cancelled_probe_frees_the_half_open_slot():
+    breaker = _half_open_breaker()
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_cancelled()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_cancelled_ainvoke_probe_does_not_wedge_the_breaker():
+    breaker = _half_open_breaker()
+    engine = _engine(breaker)
+    retrieval = RetrievalResult(query="q", query_vector=None, documents=["doc"], rows=[0])
+
+    async def cancel_probe():
+        task = asyncio.create_task(engine._ainvoke_llm("q", retrieval))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_probe())
+    assert breaker.allow_request()
+
+
+def test_disconnected_stream_probe_does_not_wedge_the_breaker():
+    breaker = _half_open_breaker()
+    engine = _engine(breaker)
+    retrieval = RetrievalResult(query="q", query_vector=None, documents=["doc"], rows=[0])
+
+    async def disconnect():
+        stream = engine.astream_explanation("q", retrieval)
+        assert await stream.__anext__() == "first chunk"
+        # What StreamingResponse does when the SSE client goes away
+        await stream.aclose()
+
+    asyncio.run(disconnect())
+    assert breaker.allow_request()
+
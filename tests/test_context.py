@@ -0,0 +1,86 @@
+import asyncio
+
+from src.rag.circuit_breaker import CircuitBreaker
+from src.rag.context import CONTEXT_SEPARATOR, ContextBuilder, compact_description
+from src.rag.rag_engine import AssessmentRecommendationEngine
+from src.rag.retrieval import RetrievalResult
+from src.utils.text import estimate_tokens
+
+
+class _Store:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def metadata(self, i):
+        return self.rows[i]
+
+
+def _assessment(i, words=20):
+    return {
+        "name": f"Assessment {i} | SHL",
+        "description": f"Assessment {i} Description " + " ".join(["skill"] * words),
+        "test_type": "K",
+        "remote_support": "Yes",
+        "adaptive_support": "No",
+        "duration_display": "30 minutes"
+    }
+
+
+def _builder(count=5, max_tokens=1000, description_words=50):
+    return ContextBuilder(_Store([_assessment(i) for i in range(count)]), max_tokens, description_words)
+
+
+def test_snippets_are_packed_in_rank_order():
+    builder = _builder()
+    context, used = builder.build([3, 1, 4])
+    assert used == [3, 1, 4]
+    assert context == CONTEXT_SEPARATOR.join(builder.snippets[row] for row in used)
+
+
+def test_context_stays_within_the_token_budget():
+    builder = _builder()
+    per_snippet = int(builder.tokens[0])
+    budget = 2 * per_snippet + builder.separator_tokens
+    context, used = builder.build([0, 1, 2, 3], max_tokens=budget)
+    assert used == [0, 1]
+    assert sum(builder.tokens[used]) + builder.separator_tokens * (len(used) - 1) <= budget
+
+    # Packing stops at the first snippet that does not fit
+    _, used = builder.build([0, 1, 2], max_tokens=budget - 1)
+    assert used == [0]
+
+
+def test_top_result_is_always_included():
+    builder = _builder()
+    context, used = builder.build([2, 0], max_tokens=1)
+    assert used == [2]
+    assert context == builder.snippets[2]
+
+
+def test_description_drops_the_name_prefix_and_metadata_tail():
+    description = "OPQ32r Description Measures behavioural style. Job levels Manager Languages English"
+    assert compact_description("OPQ32r | SHL", description, 50) == "Measures behavioural style."
+
+
+def test_description_is_cut_to_max_words():
+    builder = _builder(count=1, description_words=3)
+    assert "Description: skill skill skill …\n" in builder.snippets[0]
+    assert builder.tokens[0] == estimate_tokens(builder.snippets[0])
+
+
+def test_open_breaker_skips_building_the_prompt():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure()
+    engine = AssessmentRecommendationEngine.__new__(AssessmentRecommendationEngine)
+    engine.llm = object()
+    engine.breaker = breaker
+    built = []
+    engine._chain_inputs = lambda query, retrieval: built.append(query)
+    retrieval = RetrievalResult(query="q", query_vector=None, documents=["doc"], rows=[0])
+
+    assert engine._invoke_llm("q", retrieval) is None
+    assert asyncio.run(engine._ainvoke_llm("q", retrieval)) is None
+    assert built == []
@@ -0,0 +1,66 @@
+import numpy as np
+
+from src.rag.diversify import DiversityOptions, diversify, mmr_order
+from src.rag.retrieval import RetrievalResult
+
+
+# Candidates 0 and 1 are near-duplicates; 2 and 3 point elsewhere
+VECTORS = np.array([
+    [1.0, 0.0, 0.0],
+    [0.99, 0.14, 0.0],
+    [0.0, 1.0, 0.0],
+    [0.0, 0.0, 1.0],
+], dtype=np.float32)
+VECTORS /= np.linalg.norm(VECTORS, axis=1, keepdims=True)
+RELEVANCE = np.array([1.0, 0.95, 0.6, 0.5], dtype=np.float32)
+
+# Test type membership (candidates x codes K, P)
+TYPE_BITS = np.array([
+    [True, False],
+    [True, False],
+    [True, True],
+    [False, True],
+])
+
+
+def test_relevance_only_keeps_ranking_order():
+    assert mmr_order(RELEVANCE, VECTORS, 4, relevance_weight=1.0) == [0, 1, 2, 3]
+
+
+def test_mmr_demotes_near_duplicates():
+    order = mmr_order(RELEVANCE, VECTORS, 4, relevance_weight=0.5)
+    assert order[0] == 0
+    assert order.index(1) == 3
+
+
+def test_max_per_type_caps_each_code():
+    quotas = np.array([1, 1])
+    # 0 fills K; 2 is K too, so only 3 (P) is left
+    assert mmr_order(RELEVANCE, VECTORS, 4, 1.0, TYPE_BITS, quotas) == [0, 3]
+
+
+def test_type_quotas_per_code():
+    # K unlimited, P capped at 1: the multi-code candidate 2 uses up P
+    assert mmr_order(RELEVANCE, VECTORS, 4, 1.0, TYPE_BITS, np.array([-1, 1])) == [0, 1, 2]
+
+
+def test_zero_quota_excludes_the_code_from_the_first_pick():
+    # K has quota 0, so even the most relevant candidate is never chosen
+    assert mmr_order(RELEVANCE, VECTORS, 4, 1.0, TYPE_BITS, np.array([0, -1])) == [3]
+
+
+class _FilterIndex:
+    def type_bits(self, rows):
+        return ["K", "P"], TYPE_BITS[rows]
+
+
+def test_diversify_applies_quotas_from_options():
+    retrieval = RetrievalResult(
+        query="q", query_vector=None, rows=[0, 1, 2, 3], scores=[0.9, 0.85, 0.6, 0.5],
+        documents=["a", "b", "c", "d"]
+    )
+    options = DiversityOptions(relevance_weight=1.0, max_per_type=2, type_quotas={"p": 0})
+    diversify(retrieval, VECTORS, 4, options, _FilterIndex())
+    assert retrieval.rows == [0, 1]
+    assert retrieval.documents == ["a", "b"]
+    assert retrieval.scores == [0.9, 0.85]
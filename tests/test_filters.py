@@ -0,0 +1,72 @@
+import numpy as np
+
+from src.vector_store.filters import MetadataFilterIndex, SearchFilters
+
+
+ROWS = [
+    # remote, adaptive, test types, (min, max) minutes
+    ("Yes", "No", "K", (30, 30)),
+    ("Yes", "Yes", "P", (15, 35)),
+    ("No", "No", "K,S", (10, 10)),
+    ("Yes", "No", "A", (-1, -1)),
+    ("No", "Yes", "p", (0, 20)),
+    ("Yes", "No", "S", (45, 60)),
+]
+
+
+def _store(build_store, count=None):
+    rows = ROWS * (count // len(ROWS)) if count else ROWS
+    metadata = [
+        {"combined_text": f"assessment {i}", "remote_support": remote, "adaptive_support": adaptive, "test_type": types}
+        for i, (remote, adaptive, types, _) in enumerate(rows)
+    ]
+    arrays = {
+        "duration_min": np.array([low for *_, (low, _) in rows], dtype="int32"),
+        "duration_max": np.array([high for *_, (_, high) in rows], dtype="int32"),
+    }
+    vectors = np.random.default_rng(0).normal(size=(len(rows), 8))
+    return build_store(metadata, vectors, arrays=arrays)
+
+
+def _matches(index, **filters):
+    return np.flatnonzero(index.mask(SearchFilters(**filters))).tolist()
+
+
+def test_no_filters_means_no_mask(build_store):
+    index = MetadataFilterIndex(_store(build_store))
+    assert index.mask(None) is None
+    assert index.mask(SearchFilters()) is None
+
+
+def test_boolean_and_test_type_masks(build_store):
+    index = MetadataFilterIndex(_store(build_store))
+    assert _matches(index, remote_support=True) == [0, 1, 3, 5]
+    assert _matches(index, adaptive_support=False) == [0, 2, 3, 5]
+    # Any of the codes, case-insensitive, including multi-code rows
+    assert _matches(index, test_types=["s", "P"]) == [1, 2, 4, 5]
+    assert _matches(index, remote_support=True, adaptive_support=False, test_types=["K", "S"]) == [0, 5]
+    assert _matches(index, test_types=["X"]) == []
+
+
+def test_duration_range_masks(build_store):
+    index = MetadataFilterIndex(_store(build_store))
+    # The whole stated range must lie within the bounds; unknown durations never match
+    assert _matches(index, min_duration=15) == [0, 1, 5]
+    assert _matches(index, max_duration=30) == [0, 2, 4]
+    assert _matches(index, min_duration=10, max_duration=35) == [0, 1, 2]
+    assert _matches(index, min_duration=0, max_duration=20, remote_support=False) == [2, 4]
+
+
+def test_selective_filter_returns_exactly_k_when_k_rows_match(build_store):
+    # 60 rows, 10 of them with test type "A"
+    store = _store(build_store, count=60)
+    index = MetadataFilterIndex(store)
+    mask = index.mask(SearchFilters(test_types=["A"]))
+    assert mask.sum() == 10
+
+    query = np.random.default_rng(1).normal(size=(1, 8)).astype("float32")
+    for k in (5, 10, 20):
+        _, indices = store.search(query, k, row_mask=mask)
+        rows = indices[0][indices[0] != -1]
+        assert len(rows) == min(k, 10)
+        assert mask[rows].all()
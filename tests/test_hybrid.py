@@ -0,0 +1,101 @@
+import math
+
+import numpy as np
+
+from src.rag.rag_engine import AssessmentRecommendationEngine
+from src.vector_store.bm25 import BM25Index, reciprocal_rank_fusion
+from src.vector_store.filters import MetadataFilterIndex, SearchFilters
+
+
+CORPUS = [
+    "java developer spring java",
+    "python data analyst",
+    "sales manager negotiation",
+    "java script frontend developer",
+    "personality questionnaire",
+]
+
+
+def _reference_bm25(corpus, query, k1=1.5, b=0.75):
+    docs = [text.split() for text in corpus]
+    avg_length = sum(len(doc) for doc in docs) / len(docs)
+    scores = []
+    for doc in docs:
+        score = 0.0
+        for term in set(query.split()):
+            df = sum(term in other for other in docs)
+            tf = doc.count(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avg_length))
+        scores.append(score)
+    return np.array(scores)
+
+
+def test_bm25_scores_match_the_reference():
+    bm25 = BM25Index.build(CORPUS)
+    for query in ("java developer", "data", "manager sales questionnaire", "unknown"):
+        assert np.allclose(bm25.scores(query), _reference_bm25(CORPUS, query), atol=1e-5)
+
+
+def test_bm25_top_k_respects_the_row_mask(tmp_path):
+    bm25 = BM25Index.build(CORPUS)
+    rows, scores = bm25.top_k("java developer", 5)
+    assert rows.tolist() == [0, 3]
+    assert scores[0] > scores[1]
+
+    mask = np.array([False, True, True, True, True])
+    assert bm25.top_k("java developer", 5, row_mask=mask)[0].tolist() == [3]
+
+    bm25.save(tmp_path / "bm25.npz")
+    assert np.allclose(BM25Index.load(tmp_path / "bm25.npz").scores("java"), bm25.scores("java"))
+
+
+def test_reciprocal_rank_fusion_weights_each_ranking():
+    rows, scores = reciprocal_rank_fusion([np.array([0, 1, 2]), np.array([2, 3])], [1.0, 1.0], 5, 10, rrf_k=60)
+    # 2 is in both rankings; 1 and 3 tie at rank two and keep row order
+    assert rows.tolist() == [2, 0, 1, 3]
+    assert np.isclose(scores[0], 1 / 63 + 1 / 61)
+
+    rows, _ = reciprocal_rank_fusion([np.array([0, 1, 2]), np.array([2, 3])], [1.0, 0.01], 5, 2, rrf_k=60)
+    assert rows.tolist() == [0, 1]
+
+
+def _engine(store):
+    engine = AssessmentRecommendationEngine.__new__(AssessmentRecommendationEngine)
+    engine.store = store
+    engine.filter_index = MetadataFilterIndex(store)
+    engine.bm25 = BM25Index.build(store.columns["combined_text"].tolist())
+    engine.search_mode = "dense"
+    return engine
+
+
+def test_hybrid_fuses_dense_and_lexical_rankings_under_filters(build_store):
+    rows = [
+        {"combined_text": text, "test_type": test_type}
+        for text, test_type in zip(CORPUS, ["K", "K", "P", "K", "P"])
+    ]
+    # Dense ranking for the query vector below: 1, 4, 2, 0, 3
+    vectors = np.array([
+        [0.2, 1.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0, 0.0],
+        [0.6, 0.0, 1.0, 0.0],
+        [0.0, 0.0, 0.0, 1.0],
+        [0.9, 0.0, 0.3, 0.0],
+    ])
+    engine = _engine(build_store(rows, vectors))
+    query_vectors = np.array([[1.0, 0.0, 0.0, 0.0]], dtype="float32")
+
+    dense = engine._search_vectors(["java developer"], query_vectors, 5, mode="dense")[0]
+    assert dense.rows == [1, 4, 2, 0, 3]
+
+    hybrid = engine._search_vectors(["java developer"], query_vectors, 5, mode="hybrid")[0]
+    # Lexical matches 0 and 3 are pulled up past dense-only results
+    assert hybrid.rows == [0, 3, 1, 4, 2]
+    assert hybrid.scores == sorted(hybrid.scores, reverse=True)
+
+    filtered = engine._search_vectors(
+        ["java developer"], query_vectors, 5, filters=SearchFilters(test_types=["P"]), mode="hybrid"
+    )[0]
+    assert filtered.rows == [4, 2]
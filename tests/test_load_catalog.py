@@ -0,0 +1,36 @@
+import pandas as pd
+
+from src.ingestion.load_catalog import normalize_durations
+
+
+def _row(durations, i):
+    return normalize_durations(pd.Series(durations)).iloc[i].to_dict()
+
+
+def test_float_minutes_from_a_numeric_column_with_blanks():
+    # CSV/XLSX durations with blanks are read as float: 36.0, NaN
+    durations = normalize_durations(pd.Series([36.0, None]))
+    assert durations["duration_min"].tolist() == [36, -1]
+    assert durations["duration_max"].tolist() == [36, -1]
+    assert durations["duration_display"].tolist() == ["36 minutes", "N/A"]
+
+
+def test_text_durations():
+    durations = normalize_durations(pd.Series(["30", "15-35", "7.5 minutes", "N/A", ""]))
+    assert durations["duration_min"].tolist() == [30, 15, 8, -1, -1]
+    assert durations["duration_max"].tolist() == [30, 35, 8, -1, -1]
+    assert durations["duration_display"].tolist() == ["30 minutes", "15-35 minutes", "8 minutes", "N/A", "N/A"]
+
+
+def test_upper_bound_only_starts_at_zero():
+    for text in ("max 20", "Up to 20 minutes", "under 20"):
+        row = _row([text], 0)
+        assert (row["duration_min"], row["duration_max"]) == (0, 20)
+        assert row["duration_display"] == "Up to 20 minutes"
+
+
+def test_untimed():
+    durations = normalize_durations(pd.Series(["Untimed", "Variable 25"]))
+    assert durations["duration_untimed"].tolist() == [True, True]
+    assert durations["duration_min"].tolist() == [-1, 25]
+    assert durations["duration_display"].tolist() == ["Untimed", "Untimed (approx. 25 minutes)"]
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import src.rag.response_cache as response_cache
+from src.rag.response_cache import ResponseCache
+
+
+DOCS = ["doc-a@1", "doc-b@1"]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_exact_hit_on_normalized_query():
+    cache = ResponseCache()
+    cache.put("Java Developer!", DOCS, "2", "model", "answer")
+    assert cache.get("  java developer ", DOCS, "2", "model") == "answer"
+    assert cache.stats()["hits"] == 1
+
+
+def test_key_includes_docs_prompt_version_and_model():
+    cache = ResponseCache()
+    cache.put("java developer", DOCS, "2", "model", "answer")
+    assert cache.get("java developer", list(reversed(DOCS)), "2", "model") is None
+    assert cache.get("java developer", DOCS, "3", "model") is None
+    assert cache.get("java developer", DOCS, "2", "other-model") is None
+    assert cache.stats()["misses"] == 3
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(ttl=60.0)
+    cache.put("java developer", DOCS, "2", "model", "answer")
+    clock[0] += 59.0
+    assert cache.get("java developer", DOCS, "2", "model") == "answer"
+    clock[0] += 2.0
+    assert cache.get("java developer", DOCS, "2", "model") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_size=2)
+    cache.put("first", DOCS, "2", "model", "1")
+    cache.put("second", DOCS, "2", "model", "2")
+    # Reading "first" makes "second" the eviction candidate
+    assert cache.get("first", DOCS, "2", "model") == "1"
+    cache.put("third", DOCS, "2", "model", "3")
+    assert cache.get("second", DOCS, "2", "model") is None
+    assert cache.get("first", DOCS, "2", "model") == "1"
+    assert cache.get("third", DOCS, "2", "model") == "3"
+
+
+def test_near_duplicate_query_needs_identical_documents():
+    cache = ResponseCache(similarity_threshold=0.95)
+    vector = np.array([1.0, 0.0, 0.0])
+    close = np.array([0.99, 0.1, 0.0])
+    cache.put("java developer", DOCS, "2", "model", "answer", query_vector=vector)
+
+    assert cache.get("java engineer", DOCS, "2", "model", query_vector=close) == "answer"
+    assert cache.stats()["near_hits"] == 1
+    # Same neighbourhood, different retrieved documents or order
+    assert cache.get("java engineer", DOCS[:1], "2", "model", query_vector=close) is None
+    assert cache.get("java engineer", list(reversed(DOCS)), "2", "model", query_vector=close) is None
+    # Below the threshold
+    assert cache.get("sales manager", DOCS, "2", "model", query_vector=np.array([0.0, 1.0, 0.0])) is None
+
+
+def test_near_duplicate_lookup_is_off_without_a_threshold():
+    cache = ResponseCache()
+    cache.put("java developer", DOCS, "2", "model", "answer", query_vector=np.array([1.0, 0.0]))
+    assert cache.get("java engineer", DOCS, "2", "model", query_vector=np.array([1.0, 0.0])) is None
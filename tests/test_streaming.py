@@ -0,0 +1,80 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import src.api.routes as routes
+from src.rag.circuit_breaker import CircuitBreaker
+from src.rag.rag_engine import AssessmentRecommendationEngine, StreamInterruptedError
+from src.rag.retrieval import RetrievalResult
+
+
+class _BrokenChain:
+    async def astream(self, inputs):
+        yield "first chunk"
+        raise ConnectionError("upstream reset")
+
+
+class _Payloads:
+    def json_many(self, rows, fields=None):
+        return [b'{"name":"Assessment %d"}' % row for row in rows]
+
+
+class _Registry:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def cached(self, catalog_id=None):
+        return self.engine
+
+
+def _retrieval(query="q"):
+    return RetrievalResult(query=query, query_vector=None, documents=["doc"], rows=[0])
+
+
+def _engine(breaker):
+    # Only what the streaming path touches; no index or models are loaded
+    engine = AssessmentRecommendationEngine.__new__(AssessmentRecommendationEngine)
+    engine.llm = object()
+    engine.chain = _BrokenChain()
+    engine.breaker = breaker
+    engine.llm_timeout = 30.0
+    engine.index_version = "v000001"
+    engine.payloads = _Payloads()
+    engine.retrieve = lambda query, k, **options: _retrieval(query)
+    engine._cached_response = lambda query, retrieval: None
+    engine._chain_inputs = lambda query, retrieval: {"context": "", "query": query}
+    engine._fallback_response = lambda query, retrieval: "raw results"
+    return engine
+
+
+def test_stream_failing_mid_response_raises_with_the_fallback():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60.0)
+    engine = _engine(breaker)
+
+    async def consume():
+        chunks = []
+        try:
+            async for chunk in engine.astream_explanation("q", _retrieval()):
+                chunks.append(chunk)
+        except StreamInterruptedError as e:
+            return chunks, e.fallback
+        return chunks, None
+
+    assert asyncio.run(consume()) == (["first chunk"], "raw results")
+    # The failure counts against the breaker even though output was sent
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_recommend_stream_sends_an_error_event_before_done(monkeypatch):
+    engine = _engine(CircuitBreaker(failure_threshold=5, reset_timeout=60.0))
+    monkeypatch.setattr(routes, "registry", _Registry(engine))
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    response = TestClient(app).post("/recommend/stream", json={"query": "java developer"})
+
+    assert response.status_code == 200
+    events = [block.split("\n")[0] for block in response.text.split("\n\n") if block]
+    assert events == ["event: assessments", "event: explanation", "event: error", "event: done"]
+    assert '"fallback":"raw results"' in response.text
@@ -0,0 +1,36 @@
+from src.utils.text import split_segments
+
+
+def test_sentences_and_bullets_become_segments():
+    text = (
+        "We need a Java developer with Spring experience.\n"
+        "- Builds REST services for payments\n"
+        "- Writes unit and integration tests daily"
+    )
+    assert split_segments(text) == [
+        "We need a Java developer with Spring experience",
+        "Builds REST services for payments",
+        "Writes unit and integration tests daily",
+    ]
+
+
+def test_short_fragments_merge_into_the_previous_segment():
+    text = "Strong communication skills in English. SQL. Excel"
+    assert split_segments(text) == ["Strong communication skills in English SQL Excel"]
+
+
+def test_short_leading_fragment_merges_forward():
+    text = "Job Description\nWe need a Java developer with Spring experience."
+    assert split_segments(text) == ["Job Description We need a Java developer with Spring experience."]
+
+
+def test_only_short_fragments_stay_one_segment():
+    assert split_segments("Java. SQL.") == ["Java SQL."]
+
+
+def test_tail_beyond_max_segments_is_merged():
+    text = ". ".join(f"requirement number {i} for the role" for i in range(6))
+    segments = split_segments(text, max_segments=3)
+    assert len(segments) == 3
+    assert segments[:2] == ["requirement number 0 for the role", "requirement number 1 for the role"]
+    assert segments[2].startswith("requirement number 2") and segments[2].endswith("number 5 for the role")
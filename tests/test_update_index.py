@@ -0,0 +1,99 @@
+import hashlib
+import json
+
+import numpy as np
+
+from src.ingestion.update_index import update_index
+from src.vector_store.native_store import ID_FIELD
+from src.vector_store.versions import current_version
+
+
+class _FakeModel:
+    """Deterministic per-text vectors; records every text it is asked to embed."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def encode(self, texts, **kwargs):
+        self.embedded.extend(texts)
+        seeds = [int(hashlib.sha1(text.encode()).hexdigest()[:8], 16) for text in texts]
+        return np.array([np.random.default_rng(seed).normal(size=8) for seed in seeds], dtype="float32")
+
+
+def _assessment(name, description, duration="30"):
+    return {
+        "name": name,
+        "description": description,
+        "test_type": "K",
+        "url": f"https://example.com/{name.lower()}",
+        "duration": duration,
+    }
+
+
+def _write(path, rows):
+    path.write_text(json.dumps(rows), encoding="utf-8")
+
+
+def _snapshot(directory):
+    return {path.relative_to(directory): path.read_bytes() for path in directory.rglob("*") if path.is_file()}
+
+
+def test_incremental_update_embeds_only_changed_rows(tmp_path):
+    catalog = tmp_path / "catalog.json"
+    index = tmp_path / "index"
+    _write(catalog, [
+        _assessment("Alpha", "Java programming knowledge test"),
+        _assessment("Beta", "Numerical reasoning for analysts"),
+        _assessment("Gamma", "Sales personality questionnaire"),
+        _assessment("Delta", "Customer service simulation"),
+    ])
+    model = _FakeModel()
+    first, update = update_index(index, catalog, model=model)
+    assert update.published and update.added == 4
+    assert len(model.embedded) == 4
+    first_version = current_version(index)
+    first_ids = first.columns[ID_FIELD].tolist()
+    first_vectors = {doc_id: np.array(first.vectors[i]) for i, doc_id in enumerate(first_ids)}
+    before = _snapshot(first.path)
+    del first
+
+    # Beta re-worded, Gamma removed, Delta metadata-only, Epsilon added
+    _write(catalog, [
+        _assessment("Alpha", "Java programming knowledge test"),
+        _assessment("Beta", "Numerical and verbal reasoning for analysts"),
+        _assessment("Delta", "Customer service simulation", duration="45"),
+        _assessment("Epsilon", "Python data engineering test"),
+    ])
+    model.embedded.clear()
+    second, update = update_index(index, catalog, model=model)
+
+    assert (update.added, update.changed, update.updated, update.removed, update.unchanged) == (1, 1, 1, 1, 1)
+    assert update.embedded == 2
+    assert [text.split()[0] for text in model.embedded] == ["beta", "epsilon"]
+
+    ids = second.columns[ID_FIELD].tolist()
+    assert ids[:3] == [first_ids[0], first_ids[1], first_ids[3]]
+    for doc_id in (first_ids[0], first_ids[3]):
+        assert np.array_equal(second.vectors[ids.index(doc_id)], first_vectors[doc_id])
+    assert not np.array_equal(second.vectors[ids.index(first_ids[1])], first_vectors[first_ids[1]])
+    assert second.arrays["duration_max"][ids.index(first_ids[3])] == 45
+
+    # CURRENT moved to the new version; the previous one is untouched
+    assert current_version(index) != first_version
+    assert second.manifest["parent"] == first_version
+    assert _snapshot(index / "versions" / first_version) == before
+
+
+def test_unchanged_catalog_publishes_nothing(tmp_path):
+    catalog = tmp_path / "catalog.json"
+    index = tmp_path / "index"
+    _write(catalog, [_assessment("Alpha", "Java programming knowledge test")])
+    model = _FakeModel()
+    update_index(index, catalog, model=model)
+    version = current_version(index)
+
+    model.embedded.clear()
+    _, update = update_index(index, catalog, model=model)
+    assert not update.published
+    assert model.embedded == []
+    assert current_version(index) == version